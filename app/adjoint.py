@@ -0,0 +1,159 @@
+import functools
+import math
+from functools import cached_property
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+import sympy as sp
+from sympy.printing.numpy import NumPyPrinter
+
+from .codegen import FusedProblem, Inputs, _pattern
+from .derivatives import SparseVector, symmetric_pattern
+
+# Gradient backends selectable per solve (Optimizer.derivatives)
+DERIVATIVES = ("symbolic", "adjoint")
+
+
+def _is_leaf(node: sp.Basic) -> bool:
+    return node.is_Symbol or node.is_Number or node.is_NumberSymbol
+
+
+def _opaque(node: sp.Basic) -> bool:
+    # Nodes whose arguments are not all expressions (Piecewise, unevaluated
+    # Sum, ...) are treated as one unit and differentiated symbolically
+    return not all(isinstance(a, sp.Expr) for a in node.args) or bool(getattr(node, "bound_symbols", ()))
+
+
+def _postorder(root: sp.Basic) -> List[sp.Basic]:
+    # Distinct internal nodes, every node after all of its arguments
+    order: List[sp.Basic] = []
+    seen = set()
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if node in seen or _is_leaf(node):
+            continue
+        if expanded or _opaque(node):
+            seen.add(node)
+            order.append(node)
+            continue
+        stack.append((node, True))
+        stack.extend((a, False) for a in reversed(node.args))
+    return order
+
+
+def adjoint_value_grad(name: str, inputs: Inputs, vars_syms: Sequence[sp.Symbol], f_expr: sp.Expr) -> Callable:
+    """Emits and compiles `def name(*inputs, g)`: returns f and writes g = grad f.
+
+    The code has one forward line per distinct node of f's expression tree
+    and one reverse (adjoint) accumulation per node argument, so computing
+    the gradient costs a small constant times evaluating f, however large
+    the symbolic gradient would be. Arguments, buffers and batch shapes
+    follow generate_function.
+    """
+    printer = NumPyPrinter({'fully_qualified_modules': True})
+    refs: Dict[sp.Basic, sp.Expr] = {}
+    lines = []
+    for arr, syms in inputs:
+        for i, s in enumerate(syms):
+            local = sp.Symbol(f"_{arr}{i}", real=True)
+            refs[s] = local
+            lines.append(f"    {local} = {arr}[{i}]")
+
+    def ref(node: sp.Basic) -> sp.Expr:
+        return node if node.is_Number or node.is_NumberSymbol else refs[node]
+
+    # Forward sweep
+    order = _postorder(f_expr)
+    for k, node in enumerate(order):
+        value = sp.Symbol(f"_v{k}", real=True)
+        if _opaque(node):
+            local = node.xreplace({s: refs[s] for s in node.free_symbols})
+        else:
+            local = node.func(*map(ref, node.args))
+        lines.append(f"    {value} = {printer.doprint(local)}")
+        refs[node] = value
+
+    # Reverse sweep: each node's adjoint is complete before it is propagated
+    adjoints: Dict[sp.Basic, sp.Symbol] = {}
+    counter = [0]
+
+    def accumulate(node: sp.Basic, term: sp.Expr) -> None:
+        if node not in adjoints:
+            adjoints[node] = sp.Symbol(f"_a{counter[0]}", real=True)
+            counter[0] += 1
+            lines.append(f"    {adjoints[node]} = {printer.doprint(term)}")
+        else:
+            lines.append(f"    {adjoints[node]} = {adjoints[node]} + {printer.doprint(term)}")
+
+    if not _is_leaf(f_expr) or f_expr in refs:
+        accumulate(f_expr, sp.Float(1.0))
+    for node in reversed(order):
+        adj = adjoints.get(node)
+        if adj is None:
+            continue
+        if _opaque(node):
+            local = {s: refs[s] for s in node.free_symbols}
+            for s in local:
+                d = sp.diff(node, s).xreplace(local)
+                if d != 0:
+                    accumulate(s, adj * d)
+            continue
+        args = [a for a in dict.fromkeys(node.args) if not (a.is_Number or a.is_NumberSymbol)]
+        if node.is_Add:
+            for a in args:
+                accumulate(a, adj)
+            continue
+        local = node.func(*map(ref, node.args))
+        for a in args:
+            d = sp.diff(local, refs[a]).xreplace({local: refs[node]})
+            if d != 0:
+                accumulate(a, adj * d)
+
+    for i, v in enumerate(vars_syms):
+        if v in adjoints:
+            lines.append(f"    g[{i}] = {adjoints[v]}")
+    lines.append(f"    return {printer.doprint(ref(f_expr))}")
+
+    args = [arr for arr, _ in inputs] + ["g"]
+    source = f"def {name}({', '.join(args)}):\n" + "\n".join(lines) + "\n"
+    namespace = {"numpy": np, "math": math, "functools": functools}
+    exec(compile(source, f"<adjoint:{name}>", "exec"), namespace)
+    fn = namespace[name]
+    fn.source = source
+    return fn
+
+
+class AdjointFusedProblem(FusedProblem):
+    # FusedProblem whose value_grad is reverse-mode code built from f's tree,
+    # so no symbolic gradient is formed. The symbolic gradient and Hessian are
+    # derived only if a Hessian callable is requested (Newton, trust-constr).
+    # Constraints keep their symbolic Jacobians, as in FusedProblem.
+    def __init__(self, problem):
+        self.problem = problem
+        self.vars_syms = problem.vars_syms
+        self.params = problem.params_syms
+        self.f_expr = problem.f_expr
+        self.constraint_types = [ctype for ctype, _ in problem.constraint_exprs]
+        self.constraint_exprs = [expr for _, expr in problem.constraint_exprs]
+        self.n = len(self.vars_syms)
+        self.m = len(self.constraint_exprs)
+        self.constraint_jacobians = problem.constraint_jacobians
+        self.jacobian_entries = [(k, i, d) for k, jac in enumerate(self.constraint_jacobians) for i, d in sorted(jac.items())]
+        self.jacobian_pattern = _pattern(self.jacobian_entries)
+
+    @cached_property
+    def grad(self) -> SparseVector:
+        return self.problem.grad_entries
+
+    @cached_property
+    def hessian_entries(self) -> List[Tuple[int, int, sp.Expr]]:
+        return symmetric_pattern(self.problem.hessian_entries)
+
+    @cached_property
+    def hessian_pattern(self) -> Tuple[np.ndarray, np.ndarray]:
+        return _pattern(self.hessian_entries)
+
+    @cached_property
+    def value_grad(self) -> Callable:
+        return adjoint_value_grad("value_grad", self._inputs(), self.vars_syms, self.f_expr)
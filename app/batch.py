@@ -0,0 +1,134 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
+
+from .adjoint import DERIVATIVES
+from .parsing import LoadResult, ProblemFormatError, load_problems
+from .problem import compile_problem
+from .optimizers import SOLVERS, make_solver
+
+CSV_FIELDS = ["file", "line", "method", "status", "fval", "vars", "nit", "nfev", "ngev", "time_s", "error"]
+
+
+def expand_inputs(inputs: Iterable[str]) -> List[str]:
+    paths: List[str] = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, "*.txt")) + glob.glob(os.path.join(item, "*.jsonl"))))
+        else:
+            matches = sorted(glob.glob(item))
+            paths.extend(matches if matches else [item])
+    return paths
+
+
+def iter_problems(paths: Iterable[str]) -> Iterator[LoadResult]:
+    # Every problem of every file, lazily; unreadable files and malformed
+    # problems come through as ProblemFormatError so the batch keeps going
+    for path in paths:
+        try:
+            yield from load_problems(path, errors="yield")
+        except (OSError, UnicodeDecodeError) as exc:
+            yield ProblemFormatError(path, 0, f"{type(exc).__name__}: {exc}")
+
+
+def solve_problem(problem: LoadResult, method: str, derivatives: str = "symbolic") -> Dict:
+    record = {"file": problem.source, "line": problem.line, "method": method}
+    start = time.perf_counter()
+    try:
+        if isinstance(problem, ProblemFormatError):
+            raise problem
+        solver = make_solver(method)
+        solver.derivatives = derivatives
+        res = solver.solve(compile_problem(problem.objective, problem.variables, problem.constraints))
+        record["status"] = "ok" if res.get("vars") else "no_solution"
+        record.update(res)
+    except Exception as exc:
+        record["status"] = "error"
+        record["error"] = f"{type(exc).__name__}: {exc}"
+    record["time_s"] = time.perf_counter() - start
+    return record
+
+
+def solve_file(path: str, method: str, derivatives: str = "symbolic") -> List[Dict]:
+    return [solve_problem(problem, method, derivatives) for problem in iter_problems([path])]
+
+
+def _solve_chunk(chunk: List[LoadResult], method: str, derivatives: str) -> List[Dict]:
+    return [solve_problem(problem, method, derivatives) for problem in chunk]
+
+
+def run_batch(paths: List[str], method: str, workers: int = 0, chunksize: int = 4,
+              derivatives: str = "symbolic") -> Iterator[Dict]:
+    # Results are yielded in input order as soon as each chunk is done. Input
+    # files are read lazily and at most two chunks per worker are in flight,
+    # so memory stays constant however many problems the files hold.
+    problems = iter_problems(paths)
+    if workers == 1:
+        for problem in problems:
+            yield solve_problem(problem, method, derivatives)
+        return
+    workers = workers or os.cpu_count() or 1
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in iter(lambda: list(islice(problems, chunksize)), []):
+            pending.append(pool.submit(_solve_chunk, chunk, method, derivatives))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _to_jsonable(record: Dict) -> Dict:
+    return {k: v for k, v in record.items() if isinstance(v, (str, int, float, bool, dict, list, type(None)))}
+
+
+def write_jsonl(records: Iterable[Dict], out) -> None:
+    for rec in records:
+        out.write(json.dumps(_to_jsonable(rec), ensure_ascii=False) + "\n")
+        out.flush()
+
+
+def write_csv(records: Iterable[Dict], out) -> None:
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for rec in records:
+        row = dict(rec)
+        row["vars"] = json.dumps(rec.get("vars", {}))
+        writer.writerow(row)
+        out.flush()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Resuelve problemas .txt/.jsonl en lote, sin interfaz gráfica.")
+    parser.add_argument("inputs", nargs="+", help="Archivos, directorios o patrones glob (ej: 'examples/*.txt'); "
+                                                  "un archivo puede tener varios problemas separados por '---', o uno por línea en .jsonl")
+    parser.add_argument("-m", "--method", default="scipy", choices=list(SOLVERS), help="Método de optimización")
+    parser.add_argument("-d", "--derivatives", default="symbolic", choices=list(DERIVATIVES),
+                        help="Gradiente simbólico o por diferenciación automática en modo inverso (adjoint)")
+    parser.add_argument("-f", "--format", default="jsonl", choices=["jsonl", "csv"], help="Formato de salida")
+    parser.add_argument("-o", "--output", default="-", help="Archivo de salida ('-' para stdout)")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="Procesos (0 = núcleos disponibles, 1 = sin pool)")
+    parser.add_argument("--chunksize", type=int, default=4, help="Problemas enviados a cada proceso por tanda")
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        parser.error("No se encontraron archivos de problemas.")
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        records = run_batch(paths, args.method, workers=args.workers, chunksize=args.chunksize,
+                            derivatives=args.derivatives)
+        (write_csv if args.format == "csv" else write_jsonl)(records, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
@@ -0,0 +1,305 @@
+import argparse
+import glob
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .adjoint import DERIVATIVES
+from .parsing import _sympify, _sympify_indexed, parse_txt_problem
+from .problem import CompiledProblem
+from .optimizers import SOLVERS, SPARSE_MIN_N, make_solver
+from .plotting import clear_caches, plot_function
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLES_DIR = os.path.join(ROOT_DIR, "examples")
+
+# Cold-start budget for the UI module: best of several fresh interpreters, and
+# none of the heavy libraries may be imported before the window draws
+IMPORT_BUDGET_MS = 500.0
+HEAVY_MODULES = ("sympy", "numpy", "scipy", "matplotlib")
+
+# Known optimal values of the bundled examples (08 is 8*sqrt(3))
+KNOWN_OPTIMA = {
+    "01_unconstrained.txt": 0.0,
+    "02_lagrange_equality.txt": 0.5,
+    "03_constrained_general.txt": 0.0,
+    "04_gradient_vs_others.txt": -61.0 / 15.0,
+    "05_box_constraints_quadratic.txt": 0.0,
+    "06_distance_point_to_line.txt": 1.8,
+    "07_profit_max_negative.txt": -20.5,
+    "08_min_perimeter_fixed_area.txt": 13.856406460551018,
+    "09_nonconvex_double_well.txt": 0.0,
+    "10_mixed_constraints.txt": 0.5,
+}
+
+PHASES = ("sympify", "diff", "lambdify", "solve", "plot")
+
+# (name, objective, variables, constraints, known optimum)
+Case = Tuple[str, str, str, str, Optional[float]]
+
+
+def example_cases(directory: str = EXAMPLES_DIR) -> Iterator[Case]:
+    for path in sorted(glob.glob(os.path.join(directory, "*.txt"))):
+        with open(path, "r", encoding="utf-8") as f:
+            obj, vars_line, cons_text = parse_txt_problem(f.read())
+        name = os.path.basename(path)
+        yield name, obj, vars_line, cons_text, KNOWN_OPTIMA.get(name)
+
+
+def synthetic_cases(sizes: List[int]) -> Iterator[Case]:
+    for n in sizes:
+        xs = [f"x{i}" for i in range(n)]
+        vars_line = ",".join(xs)
+        quad = " + ".join(f"{i + 1}*({x} - {i % 3})**2" for i, x in enumerate(xs))
+        yield f"quadratic_{n}", quad, vars_line, "", 0.0
+        # Even components are shifted by 2.2 so the default start x = (1, ..., 1)
+        # is the standard start (-1.2, 1, -1.2, 1, ...); optimum at (3.2, 1, 3.2, 1, ...)
+        ys = [f"({x} - 2.2)" if i % 2 == 0 else x for i, x in enumerate(xs)]
+        rosen = " + ".join(f"100*({ys[i + 1]} - {ys[i]}**2)**2 + (1 - {ys[i]})**2" for i in range(n - 1))
+        yield f"rosenbrock_{n}", rosen, vars_line, "", 0.0
+        # min sum(x_i^2) s.a. sum(x_i) = 1  ->  x_i = 1/n, f = 1/n
+        yield f"sphere_eq_{n}", " + ".join(f"{x}**2" for x in xs), vars_line, " + ".join(xs) + " = 1", 1.0 / n
+        # min sum((x_i - 2)^2) s.a. x_i <= 1  ->  x_i = 1, f = n
+        yield f"sphere_box_{n}", " + ".join(f"({x} - 2)**2" for x in xs), vars_line, "\n".join(f"{x} <= 1" for x in xs), float(n)
+        # Indexed form: min sum((x[i] - 1)^2) s.a. sum(x[i]) = n/2  ->  x_i = 1/2, f = n/4
+        yield f"indexed_sum_{n}", f"Sum((x[i] - 1)**2, (i, 0, {n - 1}))", f"x0:{n}", f"Sum(x[i], (i, 0, {n - 1})) = {n}/2", n / 4
+        # Every x_i inside one log: each gradient entry repeats the whole sum.
+        # Optimum at x_i = 1 - 1/(2n), f = log(n) + 1 - 1/(4n)
+        lse = " + ".join(f"({x} - 1)**2" for x in xs) + " + log(" + " + ".join(f"exp({x})" for x in xs) + ")"
+        yield f"logsumexp_{n}", lse, vars_line, "", math.log(n) + 1 - 1 / (4 * n)
+
+
+# Large symbolic systems always hit the solver timeout and fall back to the
+# numeric path; skipping them above this size keeps the default run short
+SYMBOLIC_MAX_N = 5
+
+# Methods whose objective gradient comes from the fused generated code, so
+# they can run with derivatives="adjoint" ("auto" only differentiates f
+# symbolically when it may be an LP/QP)
+ADJOINT_METHODS = ("gradient", "multistart", "newton", "bfgs", "lbfgs", "scipy", "trust-constr", "auto")
+
+
+def applicable(method: str, problem: CompiledProblem, symbolic_max_n: int = SYMBOLIC_MAX_N) -> bool:
+    if method == "unconstrained" and problem.n > symbolic_max_n:
+        return False
+    if method == "gauss-newton":
+        return not problem.has_constraints and problem.residual_exprs is not None
+    if method in ("gradient", "multistart", "unconstrained", "newton", "bfgs", "lbfgs"):
+        return not problem.has_constraints
+    if method == "lagrange":
+        return bool(problem.equalities) and len(problem.equalities) == len(problem.constraints_text.splitlines())
+    return True
+
+
+def _compile_callables(problem: CompiledProblem) -> None:
+    # Scalar lambdified callables (symbolic fallbacks, plotting) and the fused array code used by the iterative solvers
+    problem.f, problem.grad_f
+    if problem.n <= SYMBOLIC_MAX_N:
+        problem.hess_f
+    fused = problem.fused
+    if problem.n >= SPARSE_MIN_N:
+        fused.value, fused.value_grad, fused.hessian_values
+        if fused.m:
+            fused.constraints_values, fused.constraints_hessian_values
+    else:
+        fused.value, fused.value_grad, fused.hessian
+        if fused.m:
+            fused.constraints, fused.constraints_hessian
+
+
+def _compile_adjoint(problem: CompiledProblem) -> None:
+    # Only the first-order code; Newton and trust-constr derive the Hessian inside the solve
+    fused = problem.adjoint_fused
+    fused.value, fused.value_grad
+    if fused.m:
+        if problem.n >= SPARSE_MIN_N:
+            fused.constraints_values
+        else:
+            fused.constraints
+
+
+def _timed(fn: Callable):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+def run_case(case: Case, method: str, plot: bool = True, symbolic_max_n: int = SYMBOLIC_MAX_N,
+             derivatives: str = "symbolic") -> Optional[Dict]:
+    name, obj, vars_line, cons_text, f_star = case
+    if derivatives != "symbolic" and method not in ADJOINT_METHODS:
+        return None
+    # Symbolic and plot phases are measured from scratch for every method
+    _sympify.cache_clear()
+    _sympify_indexed.cache_clear()
+    clear_caches()
+    times: Dict[str, Optional[float]] = dict.fromkeys(PHASES)
+    problem, times["sympify"] = _timed(lambda: (CompiledProblem(obj, vars_line, cons_text), problem_constraints(cons_text))[0])
+    if not applicable(method, problem, symbolic_max_n):
+        return None
+    if derivatives == "symbolic":
+        _, times["diff"] = _timed(lambda: (problem.grad_entries, problem.hessian_entries))
+        _, times["lambdify"] = _timed(lambda: _compile_callables(problem))
+    else:
+        # No symbolic gradient or Hessian: diff is only the constraint Jacobians
+        _, times["diff"] = _timed(lambda: problem.adjoint_fused)
+        _, times["lambdify"] = _timed(lambda: _compile_adjoint(problem))
+
+    def solver():
+        s = make_solver(method)
+        s.derivatives = derivatives
+        return s
+
+    label = method if derivatives == "symbolic" else f"{method}/{derivatives}"
+    record = {"problem": name, "method": label, "n": problem.n}
+    try:
+        res, times["solve"] = _timed(lambda: solver().solve(problem))
+        tracemalloc.start()
+        solver().solve(problem)
+        record["peak_mem_kb"] = tracemalloc.get_traced_memory()[1] / 1024.0
+        tracemalloc.stop()
+        if plot and problem.n == 2 and res.get("vars"):
+            _, times["plot"] = _timed(lambda: plot_function(problem, res))
+        record["status"] = "ok" if res.get("vars") else "no_solution"
+        for key in ("fval", "nit", "nfev", "ngev", "path"):
+            if res.get(key) is not None:
+                record[key] = res[key]
+        if f_star is not None and res.get("fval") is not None:
+            record["f_error"] = abs(res["fval"] - f_star)
+    except Exception as exc:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        record["status"] = "error"
+        record["error"] = f"{type(exc).__name__}: {exc}"
+    record["times"] = times
+    return record
+
+
+def problem_constraints(cons_text: str):
+    # Sympify of constraint lines belongs to the parse phase
+    from .parsing import parse_constraints
+    return parse_constraints(cons_text)
+
+
+def run_benchmarks(methods: List[str], sizes: List[int], repeat: int = 1, plot: bool = True,
+                   symbolic_max_n: int = SYMBOLIC_MAX_N, derivatives: Tuple[str, ...] = ("symbolic",)) -> List[Dict]:
+    cases = list(example_cases()) + list(synthetic_cases(sizes))
+    records: List[Dict] = []
+    for case in cases:
+        for method, mode in ((m, d) for m in methods for d in derivatives):
+            runs = [r for r in (run_case(case, method, plot, symbolic_max_n, mode) for _ in range(repeat)) if r is not None]
+            if not runs:
+                continue
+            best = runs[0]
+            # Keep the fastest time seen for every phase
+            for phase in PHASES:
+                seen = [r["times"][phase] for r in runs if r["times"][phase] is not None]
+                best["times"][phase] = min(seen) if seen else None
+            records.append(best)
+    return records
+
+
+def compare(records: List[Dict], baseline: List[Dict], threshold: float = 1.25, min_delta: float = 0.005) -> List[str]:
+    # A phase regresses when it is both relatively (threshold) and absolutely (min_delta s) slower
+    base = {(r["problem"], r["method"]): r for r in baseline}
+    lines = []
+    for rec in records:
+        old = base.get((rec["problem"], rec["method"]))
+        if not old:
+            continue
+        for phase in PHASES:
+            new_t, old_t = rec["times"].get(phase), old["times"].get(phase)
+            if new_t and old_t and new_t > threshold * old_t and new_t - old_t > min_delta:
+                lines.append(f"REGRESIÓN {rec['problem']} [{rec['method']}] {phase}: {old_t * 1e3:.2f} ms -> {new_t * 1e3:.2f} ms")
+        if old.get("status") == "ok" and rec.get("status") != "ok":
+            lines.append(f"REGRESIÓN {rec['problem']} [{rec['method']}]: estado {old['status']} -> {rec.get('status')}")
+    return lines
+
+
+def import_time(module: str = "app.ui", repeat: int = 3) -> Tuple[float, List[str]]:
+    # Best wall time (ms) of `import module` in a fresh interpreter, and the heavy libraries it loaded
+    code = ("import sys, time\n"
+            "start = time.perf_counter()\n"
+            f"import {module}\n"
+            "print((time.perf_counter() - start) * 1e3)\n"
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    best, heavy = float("inf"), []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout
+        ms, loaded = out.split("\n")[:2]
+        best, heavy = min(best, float(ms)), [m for m in loaded.split(",") if m]
+    return best, heavy
+
+
+def check_import_budget(module: str = "app.ui", budget_ms: float = IMPORT_BUDGET_MS) -> List[str]:
+    ms, heavy = import_time(module)
+    print(f"import {module}: {ms:.1f} ms (presupuesto {budget_ms:.0f} ms)")
+    lines = []
+    if ms > budget_ms:
+        lines.append(f"REGRESIÓN import {module}: {ms:.1f} ms > {budget_ms:.0f} ms")
+    if heavy:
+        lines.append(f"REGRESIÓN import {module} carga módulos pesados: {', '.join(heavy)}")
+    return lines
+
+
+def format_table(records: List[Dict]) -> str:
+    header = f"{'problema':34} {'método':20} {'n':>3} " + " ".join(f"{p:>9}" for p in PHASES) + f" {'nit':>6} {'nfev':>6} {'mem KB':>8} {'error f':>9}"
+    rows = [header, "-" * len(header)]
+    for r in records:
+        times = " ".join(f"{r['times'][p] * 1e3:9.2f}" if r["times"][p] is not None else f"{'-':>9}" for p in PHASES)
+        err = f"{r['f_error']:9.1e}" if "f_error" in r else f"{r['status']:>9}"
+        rows.append(f"{r['problem'][:34]:34} {r['method']:20} {r['n']:>3} {times} {r.get('nit', '-'):>6} {r.get('nfev', '-'):>6} "
+                    f"{r.get('peak_mem_kb', 0):8.0f} {err}")
+    return "\n".join(rows)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark por fases (ms) de todos los métodos sobre examples/ y problemas sintéticos.")
+    parser.add_argument("-m", "--methods", default=",".join(SOLVERS), help="Métodos separados por comas")
+    parser.add_argument("--sizes", default="2,10,30", help="Dimensiones de los problemas sintéticos")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones (se guarda el mínimo por fase)")
+    parser.add_argument("--derivatives", default="symbolic",
+                        help=f"Cálculo del gradiente, separados por comas ({', '.join(DERIVATIVES)}); "
+                             f"adjoint solo con {', '.join(ADJOINT_METHODS)}")
+    parser.add_argument("--symbolic-max-n", type=int, default=SYMBOLIC_MAX_N, help="Máximo n para métodos simbólicos")
+    parser.add_argument("--no-plot", action="store_true", help="No medir la fase de graficado")
+    parser.add_argument("--save", help="Guarda los resultados como línea base JSON")
+    parser.add_argument("--baseline", help="Compara contra una línea base JSON guardada")
+    parser.add_argument("--import-budget", type=float, nargs="?", const=IMPORT_BUDGET_MS, metavar="MS",
+                        help=f"Solo mide el arranque en frío de app.ui y falla si supera MS (por defecto {IMPORT_BUDGET_MS:.0f}) "
+                             "o si importa SymPy/NumPy/SciPy/matplotlib")
+    args = parser.parse_args(argv)
+
+    if args.import_budget is not None:
+        regressions = check_import_budget(budget_ms=args.import_budget)
+        print("\n".join(regressions) if regressions else "Arranque dentro del presupuesto.")
+        return 1 if regressions else 0
+
+    methods = [m.strip() for m in args.methods.split(",") if m.strip()]
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    derivatives = tuple(d.strip() for d in args.derivatives.split(",") if d.strip())
+    unknown = [d for d in derivatives if d not in DERIVATIVES]
+    if unknown:
+        parser.error(f"Derivadas desconocidas: {', '.join(unknown)}. Opciones: {', '.join(DERIVATIVES)}")
+    records = run_benchmarks(methods, sizes, repeat=args.repeat, plot=not args.no_plot,
+                             symbolic_max_n=args.symbolic_max_n, derivatives=derivatives)
+    print(format_table(records))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(records, f, indent=1)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(records, json.load(f))
+        print("\n".join(regressions) if regressions else "Sin regresiones respecto a la línea base.")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
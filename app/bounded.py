@@ -0,0 +1,128 @@
+import multiprocessing as mp
+import os
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+import sympy as sp
+
+try:
+    import resource
+except ImportError:  # Windows: only the wall-clock budget applies
+    resource = None
+
+
+def _address_space_bytes() -> Optional[int]:
+    # Current virtual size; the memory budget is added on top of what the
+    # worker already uses once SymPy is imported
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _worker_loop(conn, memory_mb: Optional[int]) -> None:
+    if memory_mb and resource is not None:
+        current = _address_space_bytes()
+        if current is not None:
+            limit = current + memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    while True:
+        try:
+            equations, unknowns = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            result = ("ok", sp.solve(equations, unknowns, dict=True))
+        except MemoryError:
+            result = ("memory", None)
+        except Exception as exc:
+            result = ("error", f"{type(exc).__name__}: {exc}")
+        conn.send(result)
+
+
+class _SolveWorker:
+    # A long-lived process that runs sp.solve requests one at a time. It is
+    # spawned, not forked, so it never inherits the UI's threads, and it is
+    # only replaced after a solve that timed out, was cancelled or ran out of memory.
+    def __init__(self, memory_mb: Optional[int]):
+        ctx = mp.get_context("spawn")
+        self.memory_mb = memory_mb
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_loop, args=(child, memory_mb), daemon=True)
+        self.proc.start()
+        child.close()
+
+    def close(self) -> None:
+        self.conn.close()
+        if self.proc.is_alive():
+            self.proc.kill()
+        self.proc.join()
+
+
+_worker: Optional[_SolveWorker] = None
+_worker_lock = threading.Lock()
+
+
+def _get_worker(memory_mb: Optional[int]) -> _SolveWorker:
+    # Caller holds _worker_lock
+    global _worker
+    if _worker is not None and (_worker.memory_mb != memory_mb or not _worker.proc.is_alive()):
+        _worker.close()
+        _worker = None
+    if _worker is None:
+        _worker = _SolveWorker(memory_mb)
+    return _worker
+
+
+def start_worker(memory_mb: Optional[int] = 1024) -> None:
+    # Starts the worker ahead of the first symbolic solve (UI preload)
+    with _worker_lock:
+        _get_worker(memory_mb)
+
+
+def bounded_solve(equations: List[sp.Expr], unknowns: List[sp.Symbol], timeout: Optional[float] = 10.0,
+                  memory_mb: Optional[int] = 1024, poll: Optional[Callable[[], None]] = None,
+                  poll_interval: float = 0.1) -> Tuple[str, Any]:
+    """Runs sp.solve in a worker process limited to timeout seconds and memory_mb.
+
+    Returns (status, value) where status is "ok" (value is the solution list),
+    "timeout", "memory" or "error" (value is the message). With timeout=None
+    the solve runs in-process without limits. poll() is called every
+    poll_interval seconds while waiting; an exception raised from it kills
+    the worker and propagates (used for cancellation). The worker process is
+    reused across calls and replaced after a timeout, cancellation or crash.
+    """
+    global _worker
+    if timeout is None:
+        try:
+            return "ok", sp.solve(equations, unknowns, dict=True)
+        except Exception as exc:
+            return "error", f"{type(exc).__name__}: {exc}"
+
+    with _worker_lock:
+        worker = _get_worker(memory_mb)
+        healthy = False
+        try:
+            worker.conn.send((list(equations), list(unknowns)))
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return "timeout", None
+                if worker.conn.poll(min(poll_interval, remaining)):
+                    try:
+                        status, value = worker.conn.recv()
+                    except (EOFError, OSError):
+                        # The worker died without reporting, typically killed on allocation
+                        return "memory", None
+                    healthy = status != "memory"
+                    return status, value
+                if poll is not None:
+                    poll()
+        finally:
+            if not healthy:
+                # The replacement starts now, so it is ready by the next solve
+                worker.close()
+                _worker = _SolveWorker(memory_mb)
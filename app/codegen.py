@@ -0,0 +1,305 @@
+import functools
+import math
+from functools import cached_property
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import sympy as sp
+from sympy.printing.numpy import NumPyPrinter
+
+from .derivatives import SparseMatrix, SparseVector, sparse_hessian, symmetric_pattern
+
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
+
+# (input array name, symbols read from it by position)
+Inputs = Sequence[Tuple[str, Sequence[sp.Symbol]]]
+# (output target such as "g[0]" or "J[1, 0]", expression)
+Outputs = Sequence[Tuple[str, sp.Expr]]
+
+
+def generate_function(name: str, inputs: Inputs, out_args: Sequence[str], outputs: Outputs,
+                      result: Optional[sp.Expr] = None) -> Callable:
+    """Emits and compiles `def name(*inputs, *out_args)` for the given expressions.
+
+    Common subexpressions shared by every output are hoisted once with
+    sp.cse; outputs are written into the caller's preallocated buffers and
+    `result` (if any) is returned. Each input is indexed by position, so an
+    input of shape (n,) or (n, K) (a batch of K points) works unchanged.
+    Outputs whose expression is exactly zero are skipped: buffers are
+    expected to start zeroed and be reused.
+    """
+    printer = NumPyPrinter({'fully_qualified_modules': True})
+    subs = {}
+    lines = []
+    for arr, syms in inputs:
+        for i, s in enumerate(syms):
+            local = sp.Symbol(f"_{arr}{i}")
+            subs[s] = local
+            lines.append(f"    {local} = {arr}[{i}]")
+
+    outputs = [(target, expr) for target, expr in outputs if expr != 0]
+    exprs = [sp.sympify(e).xreplace(subs) for _, e in outputs]
+    if result is not None:
+        exprs.append(sp.sympify(result).xreplace(subs))
+    replacements, reduced = sp.cse(exprs, symbols=sp.numbered_symbols("_t"), optimizations="basic")
+
+    for sym, expr in replacements:
+        lines.append(f"    {sym} = {printer.doprint(expr)}")
+    for (target, _), expr in zip(outputs, reduced):
+        lines.append(f"    {target} = {printer.doprint(expr)}")
+    if result is not None:
+        lines.append(f"    return {printer.doprint(reduced[-1])}")
+
+    args = [arr for arr, _ in inputs] + list(out_args)
+    source = f"def {name}({', '.join(args)}):\n" + ("\n".join(lines) or "    pass") + "\n"
+    namespace = {"numpy": np, "math": math, "functools": functools}
+    exec(compile(source, f"<codegen:{name}>", "exec"), namespace)
+    fn = namespace[name]
+    fn.source = source
+    return fn
+
+
+class FusedProblem:
+    # Array-signature callables for one problem. Each one is generated on first
+    # use from the objective, gradient, Hessian and constraints, with shared
+    # subterms computed once per call:
+    #   value(x) -> f
+    #   value_grad(x, g) -> f, writes g[i]
+    #   hessian(x, H) writes H[i, j]
+    #   constraints(x, c, J) writes c[k] and the Jacobian J[k, i]
+    #   constraints_hessian(x, v, H) writes sum_k v[k] * Hess(c_k)
+    # Constraints follow the SciPy convention: c_k = 0 ('eq') or c_k >= 0 ('ineq').
+    # The *_values variants write only the structural non-zeros, in the order
+    # of the matching *_pattern (row, col) arrays, for scipy.sparse assembly.
+    # With parameter symbols every callable takes the parameter vector p as its
+    # second argument (value(x, p), value_grad(x, p, g), ...); bind(p) fixes it.
+    def __init__(self, vars_syms: Tuple[sp.Symbol, ...], f_expr: sp.Expr, grad: SparseVector, hessian: SparseMatrix,
+                 constraints: List[Tuple[str, sp.Expr]], constraint_jacobians: List[SparseVector],
+                 params: Tuple[sp.Symbol, ...] = ()):
+        self.vars_syms = vars_syms
+        self.params = params
+        self.f_expr = f_expr
+        self.grad = grad
+        self.constraint_types = [ctype for ctype, _ in constraints]
+        self.constraint_exprs = [expr for _, expr in constraints]
+        self.n = len(vars_syms)
+        self.m = len(constraints)
+        self.hessian_entries = symmetric_pattern(hessian)
+        self.hessian_pattern = _pattern(self.hessian_entries)
+        self.jacobian_entries = [(k, i, d) for k, jac in enumerate(constraint_jacobians) for i, d in sorted(jac.items())]
+        self.jacobian_pattern = _pattern(self.jacobian_entries)
+        self.constraint_jacobians = constraint_jacobians
+
+    def _inputs(self, *extra) -> List:
+        return [("x", self.vars_syms)] + ([("p", self.params)] if self.params else []) + list(extra)
+
+    def bind(self, p: np.ndarray) -> "BoundFusedProblem":
+        return BoundFusedProblem(self, p)
+
+    @cached_property
+    def value(self) -> Callable:
+        return generate_function("value", self._inputs(), [], [], self.f_expr)
+
+    @cached_property
+    def value_grad(self) -> Callable:
+        outputs = [(f"g[{i}]", g) for i, g in sorted(self.grad.items())]
+        return generate_function("value_grad", self._inputs(), ["g"], outputs, self.f_expr)
+
+    @cached_property
+    def hessian(self) -> Callable:
+        outputs = [(f"H[{i}, {j}]", h) for i, j, h in self.hessian_entries]
+        return generate_function("hessian", self._inputs(), ["H"], outputs)
+
+    @cached_property
+    def hessian_values(self) -> Callable:
+        outputs = [(f"d[{p}]", h) for p, (_, _, h) in enumerate(self.hessian_entries)]
+        return generate_function("hessian_values", self._inputs(), ["d"], outputs)
+
+    @cached_property
+    def constraints(self) -> Callable:
+        outputs = [(f"c[{k}]", c) for k, c in enumerate(self.constraint_exprs)]
+        outputs += [(f"J[{k}, {i}]", d) for k, i, d in self.jacobian_entries]
+        return generate_function("constraints", self._inputs(), ["c", "J"], outputs)
+
+    @cached_property
+    def constraints_values(self) -> Callable:
+        outputs = [(f"c[{k}]", c) for k, c in enumerate(self.constraint_exprs)]
+        outputs += [(f"d[{p}]", d) for p, (_, _, d) in enumerate(self.jacobian_entries)]
+        return generate_function("constraints_values", self._inputs(), ["c", "d"], outputs)
+
+    @cached_property
+    def _weights(self) -> Tuple[sp.Symbol, ...]:
+        return tuple(sp.symbols(f"_w0:{self.m}")) if self.m else ()
+
+    @cached_property
+    def constraints_hessian_entries(self) -> List[Tuple[int, int, sp.Expr]]:
+        # sum_k w_k * Hess(c_k), built from each constraint's sparse Jacobian
+        parts: Dict[Tuple[int, int], List[sp.Expr]] = {}
+        for w, jac in zip(self._weights, self.constraint_jacobians):
+            for key, h in sparse_hessian(jac, self.vars_syms).items():
+                parts.setdefault(key, []).append(w * h)
+        return symmetric_pattern({key: sp.Add(*p) for key, p in parts.items()})
+
+    @cached_property
+    def constraints_hessian_pattern(self) -> Tuple[np.ndarray, np.ndarray]:
+        return _pattern(self.constraints_hessian_entries)
+
+    @cached_property
+    def constraints_hessian(self) -> Callable:
+        outputs = [(f"H[{i}, {j}]", h) for i, j, h in self.constraints_hessian_entries]
+        return generate_function("constraints_hessian", self._inputs(("v", self._weights)), ["H"], outputs)
+
+    @cached_property
+    def constraints_hessian_values(self) -> Callable:
+        outputs = [(f"d[{p}]", h) for p, (_, _, h) in enumerate(self.constraints_hessian_entries)]
+        return generate_function("constraints_hessian_values", self._inputs(("v", self._weights)), ["d"], outputs)
+
+
+_GENERATED = ("value", "value_grad", "hessian", "hessian_values", "constraints", "constraints_values",
+              "constraints_hessian", "constraints_hessian_values")
+
+
+class BoundFusedProblem:
+    # A parametric FusedProblem with p fixed: same callables and sparsity
+    # patterns, without the p argument
+    def __init__(self, fused: FusedProblem, p: np.ndarray):
+        self.fused = fused
+        self.p = p
+
+    def __getattr__(self, name):
+        attr = getattr(self.fused, name)
+        if name in _GENERATED:
+            p = self.p
+
+            def bound(x, *rest):
+                return attr(x, p, *rest)
+            # Cached on the instance so later lookups skip __getattr__
+            self.__dict__[name] = bound
+            return bound
+        return attr
+
+
+def residual_function(vars_syms: Tuple[sp.Symbol, ...], residuals: List[sp.Expr], jacobians: List[SparseVector]) -> Callable:
+    # residuals(x, r, J) writes r[k] and J[k, i] = d r_k / d x_i for Gauss-Newton
+    outputs = [(f"r[{k}]", r) for k, r in enumerate(residuals)]
+    outputs += [(f"J[{k}, {i}]", d) for k, jac in enumerate(jacobians) for i, d in sorted(jac.items())]
+    return generate_function("residuals", [("x", vars_syms)], ["r", "J"], outputs)
+
+
+def _pattern(entries: List[Tuple[int, int, sp.Expr]]) -> Tuple[np.ndarray, np.ndarray]:
+    rows = np.array([e[0] for e in entries], dtype=np.int64)
+    cols = np.array([e[1] for e in entries], dtype=np.int64)
+    return rows, cols
+
+
+def _csr(data: np.ndarray, pattern: Tuple[np.ndarray, np.ndarray], shape: Tuple[int, int]) -> "csr_matrix":
+    from scipy.sparse import csr_matrix
+    return csr_matrix((data.copy(), pattern), shape=shape)
+
+
+class ValueGradCache:
+    # SciPy asks for fun(x) and jac(x) separately at the same point; both are
+    # served from one fused call into preallocated buffers
+    def __init__(self, fused: FusedProblem):
+        self.fused = fused
+        self.x = np.full(fused.n, np.nan)
+        self.g = np.zeros(fused.n)
+        self.f = 0.0
+        self.ncalls = 0
+
+    def _update(self, x: np.ndarray) -> None:
+        if not np.array_equal(x, self.x):
+            self.ncalls += 1
+            self.f = float(self.fused.value_grad(x, self.g))
+            self.x[:] = x
+
+    def fun(self, x: np.ndarray) -> float:
+        self._update(x)
+        return self.f
+
+    def jac(self, x: np.ndarray) -> np.ndarray:
+        self._update(x)
+        return self.g.copy()
+
+    def hess_function(self, sparse: bool = False) -> Callable:
+        fused, n = self.fused, self.fused.n
+        if sparse:
+            d = np.zeros(len(fused.hessian_entries))
+
+            def hess(x):
+                fused.hessian_values(x, d)
+                return _csr(d, fused.hessian_pattern, (n, n))
+        else:
+            H = np.zeros((n, n))
+
+            def hess(x):
+                fused.hessian(x, H)
+                return H.copy()
+        return hess
+
+
+class ConstraintCache:
+    # Same idea for the stacked constraint vector and its Jacobian. With
+    # sparse=True Jacobians and Hessians are returned as CSR matrices.
+    def __init__(self, fused: FusedProblem, sparse: bool = False):
+        self.fused = fused
+        self.sparse = sparse
+        self.x = np.full(fused.n, np.nan)
+        self.c = np.zeros(fused.m)
+        self.v = np.zeros(fused.m)
+        if sparse:
+            self.d = np.zeros(len(fused.jacobian_entries))
+            self.hd = None
+        else:
+            self.J = np.zeros((fused.m, fused.n))
+            self.H = np.zeros((fused.n, fused.n))
+
+    def _update(self, x: np.ndarray) -> None:
+        if not np.array_equal(x, self.x):
+            if self.sparse:
+                self.fused.constraints_values(x, self.c, self.d)
+                self.J = _csr(self.d, self.fused.jacobian_pattern, (self.fused.m, self.fused.n))
+            else:
+                self.fused.constraints(x, self.c, self.J)
+            self.x[:] = x
+
+    def blocks(self) -> List[Tuple[str, np.ndarray]]:
+        out = []
+        for ctype in ("eq", "ineq"):
+            idx = np.array([k for k, t in enumerate(self.fused.constraint_types) if t == ctype], dtype=int)
+            if idx.size:
+                out.append((ctype, idx))
+        return out
+
+    def scipy_constraints(self) -> List[dict]:
+        return [{'type': ctype, 'fun': self._fun(idx), 'jac': self._jac(idx), 'hess': self._hess(idx)}
+                for ctype, idx in self.blocks()]
+
+    def _fun(self, idx):
+        def fun(x):
+            self._update(x)
+            return self.c[idx]
+        return fun
+
+    def _jac(self, idx):
+        def jac(x):
+            self._update(x)
+            return self.J[idx]
+        return jac
+
+    def _hess(self, idx):
+        fused, n = self.fused, self.fused.n
+
+        def hess(x, v):
+            self.v[:] = 0.0
+            self.v[idx] = v
+            if self.sparse:
+                if self.hd is None:
+                    self.hd = np.zeros(len(fused.constraints_hessian_entries))
+                fused.constraints_hessian_values(x, self.v, self.hd)
+                return _csr(self.hd, fused.constraints_hessian_pattern, (n, n))
+            self.H[:] = 0.0
+            fused.constraints_hessian(x, self.v, self.H)
+            return self.H.copy()
+        return hess
@@ -0,0 +1,114 @@
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .optimizers import Optimizer
+    from .problem import CompiledProblem
+
+
+# Set in each worker: task keys are put here when a task starts running
+_started = None
+
+
+def _timed_solve(key: int, solver: "Optimizer", problem: "CompiledProblem") -> Tuple[Dict, float]:
+    _started.put(key)
+    start = time.perf_counter()
+    res = solver.solve(problem)
+    return res, time.perf_counter() - start
+
+
+def _init_worker(started) -> None:
+    global _started
+    _started = started
+    # Import the heavy libraries once per worker instead of on the first solve
+    import scipy.optimize  # noqa: F401
+    import sympy  # noqa: F401
+
+
+class ComparisonPool:
+    # Runs several solvers on the same problem in parallel worker processes.
+    # The problem is pickled once per task with its symbolic derivatives, so
+    # workers only lambdify. The pool is created on the first comparison with
+    # min(methods, max_workers) processes and reused afterwards. Each method
+    # is handed to a worker only when one is idle, and its `timeout` clock
+    # starts when the worker reports that it began running it (process start-up
+    # and imports do not count). A method that exceeds it is reported as
+    # "timeout" and keeps its worker busy until the pool is recycled (all
+    # workers stuck, or the end of the run).
+    def __init__(self, max_workers: Optional[int] = None, timeout: float = 30.0, start_method: str = "spawn"):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.start_method = start_method
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._started = None
+        self._workers = 0
+
+    def _executor(self, workers: int) -> ProcessPoolExecutor:
+        if self._pool is not None and self._workers < workers:
+            self.shutdown()
+        if self._pool is None:
+            ctx = mp.get_context(self.start_method)
+            self._started = ctx.SimpleQueue()
+            self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                                             initargs=(self._started,))
+            self._workers = workers
+        return self._pool
+
+    def shutdown(self, kill: bool = False) -> None:
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        if kill:
+            # ProcessPoolExecutor cannot interrupt a running task; stragglers are killed directly
+            for proc in list((getattr(pool, "_processes", None) or {}).values()):
+                proc.kill()
+        pool.shutdown(wait=not kill, cancel_futures=True)
+        self._workers = 0
+
+    def run(self, problem: "CompiledProblem", solvers: List[Tuple[str, "Optimizer"]],
+            cancelled: Optional[Callable[[], bool]] = None, poll_interval: float = 0.1) -> Iterator[Tuple[str, str, Optional[Dict], float]]:
+        """Yields (name, status, result, seconds) as each solver finishes.
+
+        status is "ok", "timeout" or "error" (result then holds {"error": message}).
+        Raises SolveCancelled when cancelled() becomes true.
+        """
+        from .optimizers import SolveCancelled
+        queue = list(solvers)
+        workers = max(1, min(len(queue), self.max_workers))
+        pool = self._executor(workers)
+        while not self._started.empty():
+            self._started.get()  # left over from an earlier run
+        pending: Dict = {}  # future -> (name, key)
+        deadlines: Dict[int, float] = {}  # key -> deadline, once the task is running
+        stuck = 0  # timed-out tasks still occupying a worker
+        try:
+            while queue or pending:
+                if queue and stuck >= self._workers:
+                    self.shutdown(kill=True)
+                    pool, stuck = self._executor(workers), 0
+                while queue and len(pending) + stuck < self._workers:
+                    name, solver = queue.pop(0)
+                    key = len(solvers) - len(queue) - 1
+                    pending[pool.submit(_timed_solve, key, solver, problem)] = (name, key)
+                done, _ = wait(list(pending), timeout=poll_interval, return_when=FIRST_COMPLETED)
+                while not self._started.empty():
+                    deadlines[self._started.get()] = time.monotonic() + self.timeout
+                for fut in done:
+                    name, _ = pending.pop(fut)
+                    try:
+                        res, seconds = fut.result()
+                        yield name, "ok", res, seconds
+                    except Exception as exc:
+                        yield name, "error", {"error": f"{type(exc).__name__}: {exc}"}, 0.0
+                if cancelled is not None and cancelled():
+                    raise SolveCancelled()
+                now = time.monotonic()
+                for fut in [f for f, (_, key) in pending.items() if now >= deadlines.get(key, float("inf"))]:
+                    yield pending.pop(fut)[0], "timeout", None, self.timeout
+                    stuck += 1
+        finally:
+            if pending or stuck:
+                self.shutdown(kill=True)
@@ -0,0 +1,77 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import sympy as sp
+
+# Sparse derivatives: an expression is split into its additive terms and each
+# term is differentiated only with respect to the variables it contains, so a
+# sum of T small terms costs O(T) diffs instead of O(n * T).
+SparseVector = Dict[int, sp.Expr]
+SparseMatrix = Dict[Tuple[int, int], sp.Expr]
+
+
+def _terms(expr: sp.Expr) -> Sequence[sp.Expr]:
+    return expr.args if expr.is_Add else (expr,)
+
+
+def sparse_gradient(expr: sp.Expr, vars_syms: Sequence[sp.Symbol], index: Dict[sp.Symbol, int] = None) -> SparseVector:
+    index = index or {v: i for i, v in enumerate(vars_syms)}
+    parts: Dict[int, List[sp.Expr]] = {}
+    for term in _terms(expr):
+        for s in term.free_symbols:
+            i = index.get(s)
+            if i is not None:
+                parts.setdefault(i, []).append(term.diff(s))
+    grad = {i: sp.Add(*p) for i, p in parts.items()}
+    return {i: g for i, g in grad.items() if g != 0}
+
+
+def sparse_hessian(grad: SparseVector, vars_syms: Sequence[sp.Symbol], index: Dict[sp.Symbol, int] = None) -> SparseMatrix:
+    # Upper triangle (i <= j) only; the Hessian is symmetric
+    index = index or {v: i for i, v in enumerate(vars_syms)}
+    hess: SparseMatrix = {}
+    for i, g in grad.items():
+        for j, h in sparse_gradient(g, vars_syms, index).items():
+            if j >= i:
+                hess[(i, j)] = h
+    return hess
+
+
+def dense_gradient(grad: SparseVector, n: int) -> List[sp.Expr]:
+    return [grad.get(i, sp.Integer(0)) for i in range(n)]
+
+
+def symmetric_matrix(upper: SparseMatrix, n: int) -> sp.SparseMatrix:
+    entries = {}
+    for (i, j), h in upper.items():
+        entries[(i, j)] = h
+        entries[(j, i)] = h
+    return sp.SparseMatrix(n, n, entries)
+
+
+def symmetric_pattern(upper: SparseMatrix) -> List[Tuple[int, int, sp.Expr]]:
+    # Full (i, j, expr) list with both triangles, in a fixed order
+    out = []
+    for (i, j), h in sorted(upper.items()):
+        out.append((i, j, h))
+        if i != j:
+            out.append((j, i, h))
+    return out
+
+
+def sum_of_squares(expr: sp.Expr) -> Optional[List[sp.Expr]]:
+    # Residuals r_k with expr == sum(r_k**2), or None. Each additive term must be
+    # c * prod(b_i**e_i) with c >= 0 and every e_i a positive even integer.
+    residuals = []
+    for term in _terms(expr):
+        coeff, rest = term.as_coeff_Mul()
+        if not (coeff.is_Number and coeff >= 0):
+            return None
+        factor = sp.sqrt(coeff)
+        for f in sp.Mul.make_args(rest):
+            if f == 1:
+                continue
+            if not (f.is_Pow and f.exp.is_Integer and f.exp > 0 and f.exp % 2 == 0):
+                return None
+            factor *= f.base ** (f.exp // 2)
+        residuals.append(factor)
+    return residuals
@@ -0,0 +1,75 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+# Phases reported in result["timings"] (seconds); "iterate" is whatever the
+# solve spent outside the other phases
+PHASES = ("diff", "compile", "symbolic", "iterate")
+
+
+class IterateTrace:
+    # Up to `size` iterates in one preallocated (size, n + 2) array with rows
+    # [nit, x_0 .. x_{n-1}, f]. When it fills up every other row is dropped and
+    # only every 2nd (then 4th, ...) iterate is kept, so the trace always
+    # spans the whole run in bounded memory.
+    def __init__(self, size: int, n: int):
+        self.data = np.empty((size, n + 2))
+        self.count = 0
+        self.stride = 1
+
+    def record(self, nit: int, x: np.ndarray, f: Optional[float]) -> None:
+        if nit % self.stride:
+            return
+        if self.count == len(self.data):
+            kept = self.data[::2]
+            self.count = len(kept)
+            self.data[:self.count] = kept
+            self.stride *= 2
+            if nit % self.stride:
+                return
+        row = self.data[self.count]
+        row[0] = nit
+        row[1:-1] = x
+        row[-1] = np.nan if f is None else f
+        self.count += 1
+
+    def array(self) -> np.ndarray:
+        return self.data[:self.count].copy()
+
+
+class SolveStats:
+    # Per-solve instrumentation shared by every Optimizer: phase wall times,
+    # the optional iterate trace and the per-iteration callback
+    def __init__(self, n: int, trace_size: int = 0, callback: Optional[Callable] = None):
+        self.timings: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.trace = IterateTrace(trace_size, n) if trace_size else None
+        self.callback = callback
+        self.start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - start
+
+    def iterate(self, nit: int, x: np.ndarray, fval: Optional[float]) -> None:
+        if self.trace is not None:
+            self.trace.record(nit, x, fval)
+        if self.callback is not None:
+            self.callback(nit, x, fval)
+
+    def finish(self, res: Dict) -> Dict:
+        total = time.perf_counter() - self.start
+        timings = dict(res.get("timings") or dict.fromkeys(PHASES, 0.0))
+        for name in PHASES[:-1]:
+            timings[name] += self.timings[name]
+        timings["total"] = max(timings.get("total", 0.0), total)
+        timings["iterate"] = max(0.0, timings["total"] - sum(timings[name] for name in PHASES[:-1]))
+        res["timings"] = timings
+        if self.trace is not None and "trace" not in res:
+            res["trace"] = self.trace.array()
+        return res
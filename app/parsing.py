@@ -1,18 +1,56 @@
+import json
+import re
+
+import numpy as np
 import sympy as sp
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+
+@lru_cache(maxsize=512)
+def _sympify(text: str) -> sp.Expr:
+    # SymPy expressions are immutable, so parsed text can be shared safely
+    return sp.sympify(text)
+
+
+_INDEXED_NAME = re.compile(r"([A-Za-z_]\w*)\s*\[")
+
+
+@lru_cache(maxsize=512)
+def _sympify_indexed(text: str, bases: Tuple[str, ...]) -> sp.Expr:
+    # Names written as x[i] become IndexedBase; finite Sum(...) are expanded and
+    # every x[k] is then mapped to the plain symbol x{k} (as declared by "x0:500")
+    expr = sp.sympify(text, locals={b: sp.IndexedBase(b) for b in bases})
+    expr = expr.doit()
+    indexed = {}
+    for item in expr.atoms(sp.Indexed):
+        if len(item.indices) != 1 or not item.indices[0].is_Integer:
+            raise ValueError(f"Índice no numérico en {item}: usa Sum(..., (i, 0, n-1)) con límites enteros")
+        indexed[item] = sp.Symbol(f"{item.base}{int(item.indices[0])}")
+    return expr.xreplace(indexed)
+
+
+def _parse_expr(text: str) -> sp.Expr:
+    bases = tuple(sorted(set(_INDEXED_NAME.findall(text))))
+    return _sympify_indexed(text, bases) if bases else _sympify(text)
 
 
 def parse_variables(variables_text: str) -> Tuple[sp.Symbol, ...]:
+    # Accepts plain names and SymPy ranges: "x,y", "x0:500", "x0:3, y"
     variables = [v.strip() for v in variables_text.split(',') if v.strip()]
     if not variables:
         raise ValueError("Debe ingresar al menos una variable, ej: x,y")
-    return sp.symbols(variables)
+    syms = []
+    for v in variables:
+        s = sp.symbols(v)
+        syms.extend(s if isinstance(s, tuple) else [s])
+    return tuple(syms)
 
 
 def parse_objective(objective_text: str) -> sp.Expr:
     if not objective_text.strip():
         raise ValueError("Debe ingresar la función objetivo")
-    return sp.sympify(objective_text)
+    return _parse_expr(objective_text.strip())
 
 
 def parse_equalities_text(constraints_text: str) -> List[sp.Expr]:
@@ -23,32 +61,240 @@ def parse_equalities_text(constraints_text: str) -> List[sp.Expr]:
             continue
         if '=' in s and ('>=' not in s) and ('<=' not in s):
             left, right = s.split('=')
-            eqs.append(sp.sympify(left) - sp.sympify(right))
+            eqs.append(_parse_expr(left.strip()) - _parse_expr(right.strip()))
     return eqs
 
 
-def parse_scipy_constraints(vars_syms: Tuple[sp.Symbol, ...], constraints_text: str):
-    cons = []
+def parse_constraint_line(line: str) -> Optional[Tuple[str, sp.Expr]]:
+    # Normalized SciPy convention: 'eq' means g(x) = 0 and 'ineq' means g(x) >= 0.
+    # Lines without '=', '>=' or '<=' (and blank lines) give None.
+    s = line.strip()
+    if '>=' in s:
+        left, right = s.split('>=')
+        return 'ineq', _parse_expr(left.strip()) - _parse_expr(right.strip())
+    if '<=' in s:
+        left, right = s.split('<=')
+        return 'ineq', _parse_expr(right.strip()) - _parse_expr(left.strip())
+    if '=' in s:
+        left, right = s.split('=')
+        return 'eq', _parse_expr(left.strip()) - _parse_expr(right.strip())
+    return None
+
+
+def parse_constraints(constraints_text: str) -> List[Tuple[str, sp.Expr]]:
+    cons: List[Tuple[str, sp.Expr]] = []
     for line in constraints_text.splitlines():
+        parsed = parse_constraint_line(line)
+        if parsed is not None:
+            cons.append(parsed)
+    return cons
+
+
+@lru_cache(maxsize=2048)
+def check_constraint_line(line: str, vars_syms: Tuple[sp.Symbol, ...]) -> Optional[str]:
+    # Error message for one constraint line, or None if it is valid. Parsing
+    # only (nothing is lambdified) and cached, so while typing just the edited
+    # lines are checked again.
+    try:
+        parsed = parse_constraint_line(line)
+    except Exception:
+        return "expresión inválida"
+    if parsed is None:
+        return "falta '=', '>=' o '<='"
+    unknown = parsed[1].free_symbols - set(vars_syms)
+    if unknown:
+        return "variables no declaradas: " + ", ".join(sorted(str(u) for u in unknown))
+    return None
+
+
+def validate_constraints_text(constraints_text: str, vars_syms: Tuple[sp.Symbol, ...]) -> List[Tuple[int, str]]:
+    # (line number starting at 1, message) for every invalid non-blank line
+    errors = []
+    for number, line in enumerate(constraints_text.splitlines(), start=1):
+        if line.strip():
+            message = check_constraint_line(line.strip(), vars_syms)
+            if message:
+                errors.append((number, message))
+    return errors
+
+
+def parse_parameter_grid(text: str) -> Tuple[Tuple[str, ...], np.ndarray]:
+    # One parameter per line, "p = 1:5:9" (9 points from 1 to 5) or "p = 1, 2, 3".
+    # Returns the names and every combination as the rows of a (K, P) array,
+    # the last parameter varying fastest.
+    names, axes = [], []
+    for line in text.splitlines():
         s = line.strip()
         if not s:
             continue
-        if '>=' in s:
-            left, right = s.split('>=')
-            cons.append({
-                'type': 'ineq',
-                'fun': sp.lambdify(vars_syms, sp.sympify(left) - sp.sympify(right), 'numpy')
-            })
-        elif '<=' in s:
-            left, right = s.split('<=')
-            cons.append({
-                'type': 'ineq',
-                'fun': sp.lambdify(vars_syms, sp.sympify(right) - sp.sympify(left), 'numpy')
-            })
-        elif '=' in s:
-            left, right = s.split('=')
-            cons.append({
-                'type': 'eq',
-                'fun': sp.lambdify(vars_syms, sp.sympify(left) - sp.sympify(right), 'numpy')
-            })
-    return cons
+        if '=' not in s:
+            raise ValueError(f"Parámetro inválido: '{s}'. Usa p = inicio:fin:puntos o p = v1, v2, ...")
+        name, values = (part.strip() for part in s.split('=', 1))
+        if ':' in values:
+            start, stop, num = values.split(':')
+            axis = np.linspace(float(_sympify(start)), float(_sympify(stop)), int(num))
+        else:
+            axis = np.array([float(_sympify(v)) for v in values.split(',') if v.strip()])
+        if not name.isidentifier() or not axis.size:
+            raise ValueError(f"Parámetro inválido: '{s}'")
+        names.append(name)
+        axes.append(axis)
+    if not names:
+        raise ValueError("Declara al menos un parámetro, ej: p = 1:5:9")
+    grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, len(names))
+    return tuple(names), grid
+
+
+def parse_txt_problem(text: str) -> Tuple[str, str, str]:
+    # Flexible parser:
+    # Supports either labeled keys or simple 3-block format
+    # Labeled example:
+    #   objetivo: x**2 + y**2
+    #   variables: x,y
+    #   restricciones:
+    #     x + y - 1 = 0
+    #     x >= 0
+    # Simple example:
+    #   x**2 + y**2
+    #   x,y
+    #   x + y - 1 = 0
+    #   x >= 0
+    lines = [ln.strip() for ln in text.splitlines()]
+    # Try labeled first
+    obj, vars_line, cons_lines = None, None, []
+    mode = None
+    for ln in lines:
+        if not ln:
+            continue
+        lower = ln.lower()
+        if lower.startswith("objetivo:") or lower.startswith("funcion:") or lower.startswith("función:"):
+            obj = ln.split(":", 1)[1].strip()
+            mode = "obj"
+        elif lower.startswith("variables:"):
+            vars_line = ln.split(":", 1)[1].strip()
+            mode = "vars"
+        elif lower.startswith("restricciones:"):
+            mode = "cons"
+        else:
+            if mode == "cons":
+                cons_lines.append(ln)
+
+    if obj is None or vars_line is None:
+        # Fallback simple format: first non-empty line objective, second variables, rest constraints
+        non_empty = [ln for ln in lines if ln]
+        if len(non_empty) >= 2:
+            obj = obj or non_empty[0]
+            vars_line = vars_line or non_empty[1]
+            cons_lines = non_empty[2:]
+        else:
+            raise ValueError("Formato de archivo .txt no válido. Se esperan al menos 2 líneas: objetivo y variables.")
+
+    return obj, vars_line, "\n".join(cons_lines)
+
+
+# Multi-problem files: .txt blocks in either format above separated by a line
+# "---", or JSON Lines with one object per line, e.g.
+#   {"objetivo": "x**2 + y**2", "variables": "x,y", "restricciones": ["x + y = 1"]}
+PROBLEM_SEPARATOR = "---"
+_JSON_KEYS = {
+    "objective": ("objetivo", "objective", "funcion", "función"),
+    "variables": ("variables", "vars"),
+    "constraints": ("restricciones", "constraints"),
+}
+
+
+class ProblemFormatError(ValueError):
+    def __init__(self, source: str, line: int, message: str):
+        super().__init__(f"{source}:{line}: {message}")
+        self.source = source
+        self.line = line
+        self.message = message
+
+    def __reduce__(self):
+        return ProblemFormatError, (self.source, self.line, self.message)
+
+
+class LoadedProblem(NamedTuple):
+    source: str
+    line: int  # first line of the problem in its file (1-based)
+    objective: str
+    variables: str
+    constraints: str
+
+
+LoadResult = Union[LoadedProblem, ProblemFormatError]
+
+
+def _json_field(data: dict, field: str) -> Optional[str]:
+    for key in _JSON_KEYS[field]:
+        if key in data:
+            value = data[key]
+            return "\n".join(map(str, value)) if isinstance(value, list) else str(value)
+    return None
+
+
+def iter_text_problems(lines: Iterable[str], source: str = "<texto>", errors: str = "raise") -> Iterator[LoadResult]:
+    # Only the current block is kept in memory, whatever the size of the input.
+    # With errors="yield" a malformed problem is yielded as its
+    # ProblemFormatError and the stream continues with the next one.
+    block: List[str] = []
+    start = 0
+    for number, line in enumerate(lines, start=1):
+        if line.strip() == PROBLEM_SEPARATOR:
+            if block:
+                yield _checked(_text_problem, errors, block, source, start)
+            block = []
+        elif block or line.strip():
+            if not block:
+                start = number
+            block.append(line)
+    if block:
+        yield _checked(_text_problem, errors, block, source, start)
+
+
+def _checked(parse, errors: str, *args):
+    try:
+        return parse(*args)
+    except ProblemFormatError as exc:
+        if errors == "yield":
+            return exc
+        raise
+
+
+def _text_problem(block: List[str], source: str, line: int) -> LoadedProblem:
+    try:
+        return LoadedProblem(source, line, *parse_txt_problem("\n".join(block)))
+    except ValueError as exc:
+        raise ProblemFormatError(source, line, str(exc)) from None
+
+
+def _json_problem(line: str, source: str, number: int) -> LoadedProblem:
+    try:
+        data = json.loads(line)
+    except json.JSONDecodeError as exc:
+        raise ProblemFormatError(source, number, f"JSON inválido ({exc.msg})") from None
+    return problem_from_dict(data, source, number)
+
+
+def problem_from_dict(data, source: str = "<json>", line: int = 1) -> LoadedProblem:
+    # Same keys as the .jsonl format (Spanish or English names)
+    if not isinstance(data, dict):
+        raise ProblemFormatError(source, line, "se esperaba un objeto JSON")
+    objective, variables = _json_field(data, "objective"), _json_field(data, "variables")
+    if not objective or not variables:
+        raise ProblemFormatError(source, line, "faltan 'objetivo' o 'variables'")
+    return LoadedProblem(source, line, objective, variables, _json_field(data, "constraints") or "")
+
+
+def iter_jsonl_problems(lines: Iterable[str], source: str = "<jsonl>", errors: str = "raise") -> Iterator[LoadResult]:
+    for number, line in enumerate(lines, start=1):
+        if line.strip():
+            yield _checked(_json_problem, errors, line, source, number)
+
+
+def load_problems(path: str, errors: str = "raise") -> Iterator[LoadResult]:
+    # Lazily yields every problem of a .txt (separated by "---") or .jsonl file;
+    # the file is read line by line and closed when the generator finishes
+    reader = iter_jsonl_problems if path.lower().endswith((".jsonl", ".ndjson")) else iter_text_problems
+    with open(path, "r", encoding="utf-8") as f:
+        yield from reader(f, path, errors)
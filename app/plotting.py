@@ -1,50 +1,154 @@
 import base64
+import threading
+from collections import OrderedDict
 from io import BytesIO
-from typing import Dict, Tuple
+from typing import Dict, Iterator, Optional, Tuple
 
-import sympy as sp
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
+from .problem import CompiledProblem
+
+Bounds = Tuple[float, float, float, float]
+
+# Evaluated Z grids keyed by (expression, variables, bounds, resolution) and
+# finished PNGs keyed by grid + view; both are small LRU caches
+_GRID_CACHE: "OrderedDict[tuple, Tuple[np.ndarray, np.ndarray, np.ndarray]]" = OrderedDict()
+_IMAGE_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+_GRID_CACHE_SIZE = 16
+_IMAGE_CACHE_SIZE = 32
+
+# One Agg figure per view, cleared and redrawn on every plot
+_CANVASES: Dict[bool, FigureCanvasAgg] = {}
+_LOCK = threading.Lock()
+
+
+def _cache_put(cache: OrderedDict, key, value, size: int) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > size:
+        cache.popitem(last=False)
+
+
+def clear_caches() -> None:
+    # Drops the cached grids and images (the benchmark times every plot from scratch)
+    with _LOCK:
+        _GRID_CACHE.clear()
+        _IMAGE_CACHE.clear()
+
+
+def _solution_point(problem: CompiledProblem, solution: Dict) -> Tuple[Optional[float], Optional[float]]:
+    if not solution or 'vars' not in solution:
+        return None, None
+    x, y = problem.vars_syms
+    return solution['vars'].get(str(x)), solution['vars'].get(str(y))
+
+
+def _iterate_path(solution: Dict) -> Optional[np.ndarray]:
+    # (k, 3) rows [x, y, f] from the solver's iterate trace, finite rows only
+    trace = (solution or {}).get('trace')
+    if trace is None or len(trace) == 0 or trace.shape[1] != 4:
+        return None
+    path = trace[:, 1:]
+    path = path[np.isfinite(path[:, :2]).all(axis=1)]
+    return path if len(path) else None
 
-def plot_function(f_expr: sp.Expr, vars_syms: Tuple[sp.Symbol, ...], solution: Dict, show_3d: bool = False, grid: float = 5.0, n: int = 100) -> str:
-    if len(vars_syms) != 2:
-        raise ValueError("Solo se pueden graficar funciones de 2 variables.")
-    x, y = vars_syms
-    f = sp.lambdify((x, y), f_expr, 'numpy')
 
-    X = np.linspace(-grid, grid, n)
-    Y = np.linspace(-grid, grid, n)
-    X, Y = np.meshgrid(X, Y)
-    Z = f(X, Y)
+def plot_bounds(problem: CompiledProblem, solution: Dict, grid: float = 5.0) -> Bounds:
+    # Square window of half-width `grid` centred on the solution (origin if
+    # none), widened so that the whole iterate path fits
+    sx, sy = _solution_point(problem, solution)
+    cx = sx if sx is not None and np.isfinite(sx) else 0.0
+    cy = sy if sy is not None and np.isfinite(sy) else 0.0
+    path = _iterate_path(solution)
+    if path is not None:
+        reach = np.abs(path[:, :2] - (cx, cy)).max()
+        grid = max(grid, float(np.ceil(1.1 * reach)))
+    return (cx - grid, cx + grid, cy - grid, cy + grid)
 
-    fig = plt.figure(figsize=(5, 4))
+
+def _image_key(problem: CompiledProblem, solution: Dict, bounds: Bounds, n: int, show_3d: bool) -> tuple:
+    sx, sy = _solution_point(problem, solution)
+    path = _iterate_path(solution)
+    path_key = None if path is None else path.tobytes()
+    return (problem.f_expr, problem.vars_syms, bounds, n, show_3d, sx, sy, (solution or {}).get('fval'), path_key)
+
+
+def z_grid(problem: CompiledProblem, bounds: Bounds, n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    key = (problem.f_expr, problem.vars_syms, bounds, n)
+    cached = _GRID_CACHE.get(key)
+    if cached is not None:
+        _GRID_CACHE.move_to_end(key)
+        return cached
+    xmin, xmax, ymin, ymax = bounds
+    X, Y = np.meshgrid(np.linspace(xmin, xmax, n), np.linspace(ymin, ymax, n))
+    Z = np.broadcast_to(np.asarray(problem.f(X, Y), dtype=float), X.shape)
+    _cache_put(_GRID_CACHE, key, (X, Y, Z), _GRID_CACHE_SIZE)
+    return X, Y, Z
+
+
+def _canvas(show_3d: bool) -> FigureCanvasAgg:
+    canvas = _CANVASES.get(show_3d)
+    if canvas is None:
+        canvas = FigureCanvasAgg(Figure(figsize=(5, 4)))
+        _CANVASES[show_3d] = canvas
+    return canvas
+
+
+def _render(problem: CompiledProblem, solution: Dict, show_3d: bool, X, Y, Z) -> str:
+    x, y = problem.vars_syms
+    sx, sy = _solution_point(problem, solution)
+    path = _iterate_path(solution)
+    canvas = _canvas(show_3d)
+    fig = canvas.figure
+    fig.clf()
     if show_3d:
-        from mpl_toolkits.mplot3d import Axes3D  # noqa: F401
         ax = fig.add_subplot(111, projection='3d')
         ax.plot_surface(X, Y, Z, cmap='viridis', alpha=0.7)
-        if solution and 'vars' in solution and 'fval' in solution:
-            sx = solution['vars'].get(str(x))
-            sy = solution['vars'].get(str(y))
-            if sx is not None and sy is not None:
-                ax.scatter(sx, sy, solution['fval'], c='r', s=50)
-        ax.set_xlabel(str(x))
-        ax.set_ylabel(str(y))
+        if path is not None:
+            ax.plot(path[:, 0], path[:, 1], path[:, 2], 'o-', c='k', ms=3, lw=1)
+        if sx is not None and sy is not None and solution.get('fval') is not None:
+            ax.scatter(sx, sy, solution['fval'], c='r', s=50)
         ax.set_zlabel('f')
     else:
-        CS = plt.contour(X, Y, Z, levels=20)
-        plt.clabel(CS, inline=True, fontsize=8)
-        if solution and 'vars' in solution:
-            sx = solution['vars'].get(str(x))
-            sy = solution['vars'].get(str(y))
-            if sx is not None and sy is not None:
-                plt.scatter(sx, sy, c='r', marker='x', s=100)
-        plt.xlabel(str(x))
-        plt.ylabel(str(y))
+        ax = fig.add_subplot(111)
+        CS = ax.contour(X, Y, Z, levels=20)
+        ax.clabel(CS, inline=True, fontsize=8)
+        if path is not None:
+            ax.plot(path[:, 0], path[:, 1], 'o-', c='k', ms=3, lw=1)
+        if sx is not None and sy is not None:
+            ax.scatter(sx, sy, c='r', marker='x', s=100)
+    ax.set_xlabel(str(x))
+    ax.set_ylabel(str(y))
 
     buf = BytesIO()
-    plt.tight_layout()
-    plt.savefig(buf, format='png')
-    plt.close(fig)
-    data = base64.b64encode(buf.getvalue()).decode('utf-8')
-    return data
+    fig.tight_layout()
+    canvas.print_png(buf)
+    return base64.b64encode(buf.getvalue()).decode('utf-8')
+
+
+def plot_function(problem: CompiledProblem, solution: Dict, show_3d: bool = False, grid: float = 5.0, n: int = 100) -> str:
+    if problem.n != 2:
+        raise ValueError("Solo se pueden graficar funciones de 2 variables.")
+    bounds = plot_bounds(problem, solution, grid)
+    key = _image_key(problem, solution, bounds, n, show_3d)
+    with _LOCK:
+        data = _IMAGE_CACHE.get(key)
+        if data is None:
+            X, Y, Z = z_grid(problem, bounds, n)
+            data = _render(problem, solution, show_3d, X, Y, Z)
+            _cache_put(_IMAGE_CACHE, key, data, _IMAGE_CACHE_SIZE)
+        else:
+            _IMAGE_CACHE.move_to_end(key)
+        return data
+
+
+def plot_progressive(problem: CompiledProblem, solution: Dict, show_3d: bool = False, grid: float = 5.0,
+                     preview_n: int = 30, n: int = 100) -> Iterator[str]:
+    # Coarse preview first, then the full resolution; a cached full image is yielded directly
+    with _LOCK:
+        full_cached = _image_key(problem, solution, plot_bounds(problem, solution, grid), n, show_3d) in _IMAGE_CACHE
+    if not full_cached and preview_n < n:
+        yield plot_function(problem, solution, show_3d, grid, preview_n)
+    yield plot_function(problem, solution, show_3d, grid, n)
@@ -0,0 +1,208 @@
+import numpy as np
+import sympy as sp
+from functools import cached_property, lru_cache
+from typing import Callable, List, Optional, Tuple
+
+from .adjoint import AdjointFusedProblem
+from .codegen import FusedProblem, residual_function
+from .derivatives import SparseMatrix, SparseVector, dense_gradient, sparse_gradient, sparse_hessian, sum_of_squares, symmetric_matrix
+from .parsing import parse_variables, parse_objective, parse_constraints, parse_equalities_text
+from .structure import ProblemStructure, analyze
+
+
+def _normalize(objective_text: str, variables_text: str, constraints_text: str, parameters_text: str = "") -> Tuple[str, str, str, str]:
+    objective = " ".join(objective_text.split())
+    variables = ",".join(v.strip() for v in variables_text.split(',') if v.strip())
+    constraints = "\n".join(" ".join(ln.split()) for ln in constraints_text.splitlines() if ln.strip())
+    parameters = ",".join(v.strip() for v in parameters_text.split(',') if v.strip())
+    return objective, variables, constraints, parameters
+
+
+_CALLABLES = ("f", "grad_f", "hess_f", "fused", "adjoint_fused", "residuals")
+
+
+class CompiledProblem:
+    # Symbolic derivatives and lambdified callables are built on first access
+    # and kept for the lifetime of the object, so every solver reuses them.
+    # Optional parameters (e.g. "p" or "a, b") stay symbolic: the generated
+    # code takes their values as an extra argument, see bind().
+    def __init__(self, objective_text: str, variables_text: str, constraints_text: str = "", parameters_text: str = ""):
+        self.objective_text = objective_text
+        self.variables_text = variables_text
+        self.constraints_text = constraints_text
+        self.parameters_text = parameters_text
+        self.vars_syms: Tuple[sp.Symbol, ...] = tuple(parse_variables(variables_text))
+        self.params_syms: Tuple[sp.Symbol, ...] = parse_variables(parameters_text) if parameters_text.strip() else ()
+        self.f_expr: sp.Expr = parse_objective(objective_text)
+
+    def __getstate__(self):
+        # Lambdified callables cannot be pickled: symbolic results travel with
+        # the problem and the receiving process lambdifies on first use
+        return {k: v for k, v in self.__dict__.items() if k not in _CALLABLES}
+
+    @property
+    def n(self) -> int:
+        return len(self.vars_syms)
+
+    @property
+    def has_constraints(self) -> bool:
+        return bool(self.constraints_text)
+
+    @cached_property
+    def grad_entries(self) -> SparseVector:
+        return sparse_gradient(self.f_expr, self.vars_syms)
+
+    @cached_property
+    def grad(self) -> List[sp.Expr]:
+        return dense_gradient(self.grad_entries, self.n)
+
+    @cached_property
+    def hessian_entries(self) -> SparseMatrix:
+        # Upper triangle of the Hessian, only the structurally non-zero entries
+        return sparse_hessian(self.grad_entries, self.vars_syms)
+
+    @cached_property
+    def hessian(self) -> sp.SparseMatrix:
+        return symmetric_matrix(self.hessian_entries, self.n)
+
+    @cached_property
+    def f(self):
+        return sp.lambdify(self.vars_syms, self.f_expr, "numpy")
+
+    @cached_property
+    def grad_f(self):
+        return sp.lambdify(self.vars_syms, self.grad, "numpy")
+
+    @cached_property
+    def hess_f(self):
+        return sp.lambdify(self.vars_syms, self.hessian, "numpy")
+
+    @cached_property
+    def constraint_exprs(self):
+        return parse_constraints(self.constraints_text)
+
+    @cached_property
+    def constraint_jacobians(self) -> List[SparseVector]:
+        return [sparse_gradient(expr, self.vars_syms) for _, expr in self.constraint_exprs]
+
+    @cached_property
+    def fused(self) -> FusedProblem:
+        return FusedProblem(self.vars_syms, self.f_expr, self.grad_entries, self.hessian_entries,
+                            self.constraint_exprs, self.constraint_jacobians, self.params_syms)
+
+    @cached_property
+    def adjoint_fused(self) -> AdjointFusedProblem:
+        # Same callables with a reverse-mode value_grad; see with_derivatives()
+        return AdjointFusedProblem(self)
+
+    def with_derivatives(self, derivatives: str = "symbolic"):
+        # "symbolic": this problem; "adjoint": a view whose fused code takes
+        # the gradient in reverse mode instead of from the symbolic gradient
+        if derivatives == "symbolic":
+            return self
+        if derivatives == "adjoint":
+            return AdjointProblem(self)
+        raise ValueError(f"Derivadas desconocidas: {derivatives}. Opciones: symbolic, adjoint")
+
+    def bind(self, values) -> "BoundProblem":
+        return BoundProblem(self, values)
+
+    @cached_property
+    def structure(self) -> ProblemStructure:
+        # LP/QP/box matrices, extracted once from the symbolic derivatives; f is
+        # only differentiated when it can be linear or quadratic
+        return analyze(self.vars_syms, self.f_expr, lambda: (self.grad_entries, self.hessian_entries),
+                       self.constraint_exprs, self.constraint_jacobians)
+
+    @cached_property
+    def residual_exprs(self) -> Optional[List[sp.Expr]]:
+        # Set when the objective is a sum of squares (Gauss-Newton applies)
+        return sum_of_squares(self.f_expr)
+
+    @cached_property
+    def residuals(self) -> Optional[Callable]:
+        if self.residual_exprs is None:
+            return None
+        jacobians = [sparse_gradient(r, self.vars_syms) for r in self.residual_exprs]
+        return residual_function(self.vars_syms, self.residual_exprs, jacobians)
+
+    def f_rows(self, X: np.ndarray) -> np.ndarray:
+        # Evaluates f on every row of X (shape (K, n)) in one vectorized call
+        return np.broadcast_to(np.asarray(self.fused.value(X.T), dtype=float), X.shape[:1])
+
+    def grad_rows(self, X: np.ndarray, out: np.ndarray) -> np.ndarray:
+        # out.T is a view, so the generated code writes the (K, n) rows in place;
+        # zero gradient entries are never written and must start zeroed
+        self.fused.value_grad(X.T, out.T)
+        return out
+
+    @cached_property
+    def equalities(self) -> List[sp.Expr]:
+        return parse_equalities_text(self.constraints_text)
+
+
+class BoundProblem:
+    # A parametric CompiledProblem with numeric parameter values. It shares the
+    # symbolic work and generated code of the parent and offers what the
+    # fused-code solvers use (n, vars_syms, fused, f_rows, grad_rows).
+    residuals = None
+
+    def __init__(self, problem: CompiledProblem, values):
+        self.problem = problem
+        self.values = np.asarray(values, dtype=float).reshape(len(problem.params_syms))
+        self.vars_syms = problem.vars_syms
+        self.fused = problem.fused.bind(self.values)
+
+    @property
+    def n(self) -> int:
+        return self.problem.n
+
+    @property
+    def has_constraints(self) -> bool:
+        return self.problem.has_constraints
+
+    @cached_property
+    def structure(self) -> ProblemStructure:
+        return ProblemStructure("general", self.n)
+
+    @cached_property
+    def adjoint_fused(self):
+        return self.problem.adjoint_fused.bind(self.values)
+
+    with_derivatives = CompiledProblem.with_derivatives
+    f_rows = CompiledProblem.f_rows
+    grad_rows = CompiledProblem.grad_rows
+
+
+class AdjointProblem:
+    # A CompiledProblem or BoundProblem whose fused code uses the reverse-mode
+    # gradient; everything else is the wrapped problem's. structure stays
+    # shared: it only differentiates f when f is at most quadratic.
+    def __init__(self, problem):
+        self.problem = problem
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    @cached_property
+    def fused(self):
+        return self.problem.adjoint_fused
+
+    def with_derivatives(self, derivatives: str = "symbolic"):
+        return self.problem.with_derivatives(derivatives)
+
+    f_rows = CompiledProblem.f_rows
+    grad_rows = CompiledProblem.grad_rows
+
+
+@lru_cache(maxsize=32)
+def _compile(objective: str, variables: str, constraints: str, parameters: str = "") -> CompiledProblem:
+    return CompiledProblem(objective, variables, constraints, parameters)
+
+
+def compile_problem(objective_text: str, variables_text: str, constraints_text: str = "", parameters_text: str = "") -> CompiledProblem:
+    return _compile(*_normalize(objective_text, variables_text, constraints_text, parameters_text))
+
+
+def clear_cache() -> None:
+    _compile.cache_clear()
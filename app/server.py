@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from .adjoint import DERIVATIVES
+from .batch import _to_jsonable, solve_problem
+from .optimizers import SOLVERS
+from .parsing import LoadedProblem, ProblemFormatError, problem_from_dict
+
+# POST /solve   {"objetivo": "...", "variables": "x,y", "restricciones": [...], "method": "auto",
+#                "derivatives": "symbolic" | "adjoint"}
+# GET  /health  pool size, requests in flight and the available methods
+
+
+def _warm_up() -> None:
+    # Heavy libraries are imported once per worker, before the first request
+    import scipy.optimize  # noqa: F401
+    from . import optimizers, problem  # noqa: F401
+
+
+def _solve_request(problem: LoadedProblem, method: str, derivatives: str) -> Dict:
+    # Runs in a worker; compile_problem's LRU cache keeps repeated problems compiled
+    return _to_jsonable(solve_problem(problem, method, derivatives))
+
+
+class SolveService:
+    # Pool of pre-warmed worker processes. At most `max_pending` requests are
+    # admitted at once (running or queued); beyond that a request waits up to
+    # `admit_timeout` seconds for a slot and is then rejected as busy. A request
+    # that times out while running cannot be interrupted in its worker, so the
+    # pool is replaced and its processes killed; other requests caught on the
+    # old pool are resubmitted once to the new one.
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None, timeout: float = 60.0,
+                 admit_timeout: float = 0.5):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.workers
+        self.timeout = timeout
+        self.admit_timeout = admit_timeout
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up)
+
+    def warm_up(self, wait: bool = True) -> None:
+        futures = [self._pool.submit(_warm_up) for _ in range(self.workers)]
+        if wait:
+            for fut in futures:
+                fut.result()
+
+    def _submit(self, *args):
+        with self._lock:
+            return self._pool, self._pool.submit(_solve_request, *args)
+
+    def _recycle(self, pool: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is not pool:
+                return  # already replaced by another request
+            self._pool = self._new_pool()
+            self.warm_up(wait=False)
+        for proc in list((getattr(pool, "_processes", None) or {}).values()):
+            proc.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def solve(self, data) -> Tuple[int, Dict]:
+        # (HTTP status, JSON body)
+        start = time.perf_counter()
+        try:
+            problem = problem_from_dict(data, "<request>")
+        except ProblemFormatError as exc:
+            return 400, {"status": "error", "error": exc.message}
+        method = data.get("method", "auto")
+        if method not in SOLVERS:
+            return 400, {"status": "error", "error": f"Método desconocido: {method}. Opciones: {', '.join(SOLVERS)}"}
+        derivatives = data.get("derivatives", "symbolic")
+        if derivatives not in DERIVATIVES:
+            return 400, {"status": "error",
+                         "error": f"Derivadas desconocidas: {derivatives}. Opciones: {', '.join(DERIVATIVES)}"}
+
+        if not self._slots.acquire(timeout=self.admit_timeout):
+            return 503, {"status": "busy", "error": f"Servidor ocupado ({self.max_pending} solicitudes en curso)"}
+        try:
+            with self._lock:
+                self._pending += 1
+            submitted = time.perf_counter()
+            for attempt in range(2):
+                pool, future = self._submit(problem, method, derivatives)
+                try:
+                    record = future.result(timeout=self.timeout)
+                    break
+                except TimeoutError:
+                    if not future.cancel():
+                        self._recycle(pool)
+                    return 504, {"status": "timeout", "error": f"Tiempo agotado (> {self.timeout:.0f} s)"}
+                except (BrokenProcessPool, CancelledError):
+                    # Recycled under this request, or a worker died; a second failure is this request's own
+                    self._recycle(pool)
+                    if attempt:
+                        return 500, {"status": "error", "error": "El proceso de cálculo terminó inesperadamente"}
+        finally:
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+
+        record.pop("file", None)
+        record.pop("line", None)
+        record["server_timings"] = {
+            "admit_s": submitted - start,
+            # time_s is measured inside the worker; the rest is queueing and IPC
+            "queue_s": max(0.0, time.perf_counter() - submitted - record["time_s"]),
+            "total_s": time.perf_counter() - start,
+        }
+        return 200, record
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool = self._pool
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def make_handler(service: SolveService, verbose: bool = False):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: Dict) -> None:
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            if status == 503:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path != "/health":
+                return self._send(404, {"status": "error", "error": "Ruta no encontrada"})
+            self._send(200, {"status": "ok", "workers": service.workers, "pending": service.pending,
+                             "max_pending": service.max_pending, "methods": list(SOLVERS),
+                             "derivatives": list(DERIVATIVES)})
+
+        def do_POST(self):
+            if self.path != "/solve":
+                return self._send(404, {"status": "error", "error": "Ruta no encontrada"})
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                data = json.loads(self.rfile.read(length) or b"null")
+            except (ValueError, UnicodeDecodeError) as exc:
+                return self._send(400, {"status": "error", "error": f"JSON inválido: {exc}"})
+            self._send(*service.solve(data))
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Servicio local HTTP/JSON de optimización con procesos precalentados.")
+    parser.add_argument("--host", default="127.0.0.1", help="Dirección de escucha (por defecto solo local)")
+    parser.add_argument("--port", type=int, default=8765, help="Puerto")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="Procesos de cálculo (0 = núcleos disponibles)")
+    parser.add_argument("--max-pending", type=int, default=0, help="Solicitudes admitidas a la vez (0 = 4 por proceso)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Tiempo máximo por solicitud (s)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Registra cada solicitud en stderr")
+    args = parser.parse_args(argv)
+
+    service = SolveService(args.workers or None, args.max_pending or None, args.timeout)
+    service.warm_up()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service, args.verbose))
+    print(f"Escuchando en http://{args.host}:{server.server_address[1]} ({service.workers} procesos)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+import math
+from typing import Callable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import sympy as sp
+
+from .derivatives import SparseMatrix, SparseVector
+
+# Problem classes recognised by analyze(), from most to least specialised;
+# "infeasible" marks a constant constraint that can never hold (0 >= 1)
+KINDS = ("lp", "qp", "box", "general", "infeasible")
+
+
+def _number(expr: sp.Expr) -> Optional[float]:
+    expr = sp.sympify(expr)
+    if not expr.is_number:
+        return None
+    try:
+        value = complex(expr)
+    except (TypeError, ValueError):
+        return None
+    if value.imag or not np.isfinite(value.real):
+        return None
+    return value.real
+
+
+class ProblemStructure:
+    # Numeric matrices of a problem whose pieces are linear or quadratic:
+    #   f(x) = 1/2 x^T Q x + c^T x + f0
+    #   A_eq x = b_eq,  A_ub x <= b_ub,  lb <= x <= ub
+    # Single-variable inequalities become bounds; Q is None for a linear f.
+    def __init__(self, kind: str, n: int):
+        self.kind = kind
+        self.Q: Optional[np.ndarray] = None
+        self.c = np.zeros(n)
+        self.f0 = 0.0
+        self.A_eq = np.zeros((0, n))
+        self.b_eq = np.zeros(0)
+        self.A_ub = np.zeros((0, n))
+        self.b_ub = np.zeros(0)
+        self.lb = np.full(n, -np.inf)
+        self.ub = np.full(n, np.inf)
+
+    @property
+    def has_bounds(self) -> bool:
+        return bool(np.isfinite(self.lb).any() or np.isfinite(self.ub).any())
+
+    def inequalities(self) -> Tuple[np.ndarray, np.ndarray]:
+        # General rows and finite bounds stacked as G x <= h
+        n = self.c.size
+        rows, rhs = [self.A_ub], [self.b_ub]
+        eye = np.eye(n)
+        finite_ub = np.isfinite(self.ub)
+        finite_lb = np.isfinite(self.lb)
+        rows += [eye[finite_ub], -eye[finite_lb]]
+        rhs += [self.ub[finite_ub], -self.lb[finite_lb]]
+        return np.vstack(rows), np.concatenate(rhs)
+
+
+def _degree(expr: sp.Basic, vars_set: Set[sp.Symbol]) -> float:
+    # Upper bound on the total degree in vars_set, without expanding; inf when
+    # expr is not a polynomial in them
+    if expr.is_Symbol:
+        return 1 if expr in vars_set else 0
+    if expr.is_Atom:
+        return 0
+    degrees = [_degree(a, vars_set) for a in expr.args]
+    if expr.is_Add:
+        return max(degrees)
+    if expr.is_Mul:
+        return sum(degrees)
+    if expr.is_Pow and expr.exp.is_Integer and expr.exp >= 0:
+        return degrees[0] * int(expr.exp)
+    return 0 if not any(degrees) else math.inf
+
+
+def _linear(grad: SparseVector, n: int) -> Optional[np.ndarray]:
+    a = np.zeros(n)
+    for i, d in grad.items():
+        value = _number(d)
+        if value is None:
+            return None
+        a[i] = value
+    return a
+
+
+def _quadratic(hessian: SparseMatrix, n: int) -> Optional[np.ndarray]:
+    Q = np.zeros((n, n))
+    for (i, j), h in hessian.items():
+        value = _number(h)
+        if value is None:
+            return None
+        Q[i, j] = Q[j, i] = value
+    return Q
+
+
+def analyze(vars_syms: Sequence[sp.Symbol], f_expr: sp.Expr, derivatives: Callable[[], Tuple[SparseVector, SparseMatrix]],
+            constraints: List[Tuple[str, sp.Expr]], constraint_jacobians: List[SparseVector]) -> ProblemStructure:
+    # derivatives() returns f's gradient and Hessian; it is only called once the
+    # constraints are linear and f is at most quadratic
+    n = len(vars_syms)
+    zero = {v: 0 for v in vars_syms}
+    general = ProblemStructure("general", n)
+    if not constraints:
+        return general
+
+    # Constant constraints (empty Jacobian) either always hold or make the
+    # problem infeasible, whatever the other constraints are
+    for (ctype, expr), jac in zip(constraints, constraint_jacobians):
+        g0 = _number(expr) if not jac else None
+        if g0 is not None and ((abs(g0) > 1e-12) if ctype == "eq" else (g0 < -1e-12)):
+            return ProblemStructure("infeasible", n)
+
+    # Constraints: every one linear, a x + g0 (= or >=) 0
+    structure = ProblemStructure("general", n)
+    eq_rows, eq_rhs, ub_rows, ub_rhs = [], [], [], []
+    only_bounds = True
+    for (ctype, expr), jac in zip(constraints, constraint_jacobians):
+        a = _linear(jac, n)
+        g0 = _number(expr.xreplace(zero))
+        if a is None or g0 is None:
+            return general
+        nonzero = np.flatnonzero(a)
+        if not nonzero.size:
+            continue
+        if ctype == "eq":
+            eq_rows.append(a)
+            eq_rhs.append(-g0)
+            only_bounds = False
+        elif nonzero.size == 1:
+            i = nonzero[0]
+            bound = -g0 / a[i] + 0.0  # + 0.0 avoids -0.0
+            if a[i] > 0:
+                structure.lb[i] = max(structure.lb[i], bound)
+            else:
+                structure.ub[i] = min(structure.ub[i], bound)
+        else:
+            ub_rows.append(-a)
+            ub_rhs.append(g0)
+            only_bounds = False
+    if eq_rows:
+        structure.A_eq, structure.b_eq = np.array(eq_rows), np.array(eq_rhs)
+    if ub_rows:
+        structure.A_ub, structure.b_ub = np.array(ub_rows), np.array(ub_rhs)
+
+    # Objective: linear (empty Hessian) or quadratic (constant Hessian)
+    if _degree(f_expr, set(vars_syms)) > 2:
+        structure.kind = "box" if only_bounds else "general"
+        return structure
+    grad, hessian = derivatives()
+    c = _linear({i: g.xreplace(zero) for i, g in grad.items()}, n)
+    f0 = _number(f_expr.xreplace(zero))
+    Q = _quadratic(hessian, n) if hessian else None
+    if c is None or f0 is None or (hessian and Q is None):
+        structure.kind = "box" if only_bounds else "general"
+        return structure
+    structure.c, structure.f0, structure.Q = c, f0, Q
+    if Q is None:
+        structure.kind = "lp"
+    elif only_bounds:
+        structure.kind = "box"
+    elif np.linalg.eigvalsh(Q).min() > 1e-10:
+        # Strictly convex QP: the active-set solver needs a non-singular Q
+        structure.kind = "qp"
+    return structure
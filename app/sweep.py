@@ -0,0 +1,127 @@
+import argparse
+import csv
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .parsing import load_problems, parse_parameter_grid
+from .problem import CompiledProblem, compile_problem
+from .optimizers import SolveCancelled, make_solver
+
+# Methods that only use the generated code, so they run on a BoundProblem
+SWEEP_METHODS = ("scipy", "trust-constr", "gradient", "newton", "bfgs", "lbfgs")
+
+
+def solve_chunk(problem: CompiledProblem, method: str, grid: np.ndarray, continuation: bool = True,
+                cancelled: Optional[Callable[[], bool]] = None) -> Iterator[Dict]:
+    # Solves the grid rows in order; with continuation each point starts from
+    # the previous point's solution instead of the solver's default x0
+    names = [str(p) for p in problem.params_syms]
+    x_prev = None
+    for values in grid:
+        if cancelled is not None and cancelled():
+            raise SolveCancelled()
+        record = {"params": dict(zip(names, map(float, values)))}
+        start = time.perf_counter()
+        try:
+            solver = make_solver(method)
+            if continuation and x_prev is not None:
+                solver.x0 = x_prev
+            res = solver.solve(problem.bind(values))
+            record["status"] = "ok" if res.get("vars") else "no_solution"
+            record.update(res)
+            x = np.array([res["vars"][str(v)] for v in problem.vars_syms]) if res.get("vars") else None
+            x_prev = x if x is not None and np.isfinite(x).all() else x_prev
+        except SolveCancelled:
+            raise
+        except Exception as exc:
+            record["status"] = "error"
+            record["error"] = f"{type(exc).__name__}: {exc}"
+        record["time_s"] = time.perf_counter() - start
+        yield record
+
+
+def _solve_chunk_args(args) -> List[Dict]:
+    return list(solve_chunk(*args))
+
+
+def sweep(problem: CompiledProblem, grid: np.ndarray, method: str = "scipy", continuation: bool = True,
+          workers: int = 1, cancelled: Optional[Callable[[], bool]] = None) -> Iterator[Dict]:
+    # Symbolic derivatives are computed once here; the generated code takes the
+    # parameters as an argument. With workers > 1 the grid is split into
+    # contiguous chunks, each solved in its own process with continuation.
+    if method not in SWEEP_METHODS:
+        raise ValueError(f"Método no disponible para barridos: {method}. Opciones: {', '.join(SWEEP_METHODS)}")
+    problem.grad_entries, problem.hessian_entries, problem.constraint_jacobians
+    if workers == 1:
+        yield from solve_chunk(problem, method, grid, continuation, cancelled)
+        return
+    chunks = [(problem, method, chunk, continuation) for chunk in np.array_split(grid, workers) if len(chunk)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for records in pool.map(_solve_chunk_args, chunks):
+            if cancelled is not None and cancelled():
+                raise SolveCancelled()
+            yield from records
+
+
+def sweep_arrays(problem: CompiledProblem, records: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # (P (K, p), X (K, n), F (K,)); points without a solution are NaN
+    P = np.array([[r["params"][str(p)] for p in problem.params_syms] for r in records])
+    X = np.full((len(records), problem.n), np.nan)
+    F = np.full(len(records), np.nan)
+    for k, r in enumerate(records):
+        if r.get("vars"):
+            X[k] = [r["vars"][str(v)] for v in problem.vars_syms]
+            F[k] = r["fval"]
+    return P, X, F
+
+
+def write_csv(problem: CompiledProblem, records: Iterator[Dict], out) -> None:
+    params = [str(p) for p in problem.params_syms]
+    variables = [str(v) for v in problem.vars_syms]
+    writer = csv.writer(out)
+    writer.writerow(params + variables + ["fval", "nit", "status", "time_s"])
+    for r in records:
+        row = [r["params"][p] for p in params]
+        row += [r.get("vars", {}).get(v, "") for v in variables]
+        row += [r.get("fval", ""), r.get("nit", ""), r["status"], r["time_s"]]
+        writer.writerow(row)
+        out.flush()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Resuelve un problema .txt para una malla de valores de sus parámetros.")
+    parser.add_argument("problem", help="Archivo .txt del problema (los parámetros quedan como símbolos libres)")
+    parser.add_argument("-p", "--param", action="append", required=True,
+                        help="Parámetro y valores: 'p = 1:5:9' (9 puntos) o 'p = 1, 2, 3'; repetible")
+    parser.add_argument("-m", "--method", default="scipy", choices=SWEEP_METHODS, help="Método de optimización")
+    parser.add_argument("-o", "--output", default="-", help="Archivo CSV de salida ('-' para stdout)")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="Procesos; la malla se reparte en tramos contiguos")
+    parser.add_argument("--no-continuation", action="store_true", help="Cada punto parte del x0 por defecto")
+    args = parser.parse_args(argv)
+
+    names, grid = parse_parameter_grid("\n".join(args.param))
+    problems = load_problems(args.problem)
+    try:
+        first = next(problems, None)
+    finally:
+        problems.close()
+    if first is None:
+        parser.error(f"{args.problem} no contiene ningún problema.")
+    problem = compile_problem(first.objective, first.variables, first.constraints, ",".join(names))
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        records = sweep(problem, grid, args.method, continuation=not args.no_continuation, workers=args.workers)
+        write_csv(problem, records, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,38 @@
+import importlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
 import flet as ft
-import sympy as sp
-from typing import Dict, Tuple
 
-from .parsing import parse_variables, parse_objective, parse_scipy_constraints, parse_equalities_text
-from .optimizers import UnconstrainedSolver, GradientDescentSolver, LagrangeSolver, ConstrainedSciPySolver
-from .plotting import plot_function
+from .compare import ComparisonPool
+
+# SymPy, NumPy, SciPy and matplotlib are imported by the handlers that need
+# them, so the window draws before any of them loads. preload() imports them
+# in the background, in the order they are usually needed.
+PRELOAD_MODULES = ("app.problem", "app.optimizers", "app.warmstart", "scipy.optimize", "app.plotting", "app.sweep")
+
+
+def preload() -> None:
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass  # the handler that needs it will raise and report the error
+    try:
+        # Process for the symbolic solves (sp.solve with time and memory limits)
+        from .bounded import start_worker
+        start_worker()
+    except Exception:
+        pass
 
 
 def OptimizerView(page: ft.Page) -> ft.Control:
     # Inputs
     txt_objective = ft.TextField(
         label="Función objetivo",
-        hint_text="Ej: x**2 + y**2",
+        hint_text="Ej: x**2 + y**2  o  Sum((x[i] - 1)**2, (i, 0, 499))",
         helper_text="Escribe la función en notación SymPy (usa ** para potencias)",
         multiline=True,
         min_lines=2,
@@ -19,7 +40,7 @@ def OptimizerView(page: ft.Page) -> ft.Control:
     )
     txt_vars = ft.TextField(
         label="Variables",
-        hint_text="Ej: x,y",
+        hint_text="Ej: x,y  o  x0:500",
         helper_text="Lista separada por comas (los nombres deben coincidir con la función)",
     )
     txt_constraints = ft.TextField(
@@ -30,18 +51,44 @@ def OptimizerView(page: ft.Page) -> ft.Control:
         min_lines=3,
         expand=True,
     )
+    txt_params = ft.TextField(
+        label="Parámetros (barrido)",
+        hint_text="Uno por línea. Ej: p = 0:5:11  o  p = 1, 2, 3",
+        helper_text="Símbolos libres de la función; 'Barrido' resuelve cada combinación",
+        multiline=True,
+        min_lines=1,
+    )
     cb_method = ft.Dropdown(
         label="Método",
         options=[
             ft.dropdown.Option("Sin restricciones (minimización directa)"),
             ft.dropdown.Option("Gradiente descendente"),
+            ft.dropdown.Option("Gradiente multi-inicio (varios mínimos)"),
+            ft.dropdown.Option("Newton (región de confianza)"),
+            ft.dropdown.Option("Cuasi-Newton BFGS"),
+            ft.dropdown.Option("Cuasi-Newton L-BFGS"),
+            ft.dropdown.Option("Gauss-Newton (suma de cuadrados)"),
             ft.dropdown.Option("Método de Lagrange (igualdad)"),
             ft.dropdown.Option("Con restricciones (general)"),
+            ft.dropdown.Option("Con restricciones (trust-constr, Hessiana exacta)"),
         ],
         value="Sin restricciones (minimización directa)",
         expand=True,
     )
 
+    cb_step = ft.Dropdown(
+        label="Paso (gradiente)",
+        options=[
+            ft.dropdown.Option(key="fixed", text="Fijo (alpha = 0.01)"),
+            ft.dropdown.Option(key="armijo", text="Búsqueda lineal (Armijo)"),
+            ft.dropdown.Option(key="nesterov", text="Momento de Nesterov"),
+            ft.dropdown.Option(key="adam", text="Adam"),
+            ft.dropdown.Option(key="bb", text="Barzilai-Borwein"),
+        ],
+        value="armijo",
+        expand=True,
+    )
+
     switch_3d = ft.Switch(label="Mostrar 3D", value=False)
 
     txt_results = ft.TextField(
@@ -56,72 +103,43 @@ def OptimizerView(page: ft.Page) -> ft.Control:
 
     # State holder
     last_solution = {"value": None}
+    # Soluciones anteriores por estructura del problema, para arrancar en caliente al re-resolver
+    # (se crea en la primera resolución)
+    warm_store = {"value": None}
 
     # File picker (to load .txt problems)
     fp = ft.FilePicker()
     page.overlay.append(fp)
     auto_solve_switch = ft.Switch(label="Resolver al cargar", value=True)
-
-    def parse_txt_problem(text: str):
-        # Flexible parser:
-        # Supports either labeled keys or simple 3-block format
-        # Labeled example:
-        #   objetivo: x**2 + y**2
-        #   variables: x,y
-        #   restricciones:
-        #     x + y - 1 = 0
-        #     x >= 0
-        # Simple example:
-        #   x**2 + y**2
-        #   x,y
-        #   x + y - 1 = 0
-        #   x >= 0
-        lines = [ln.strip() for ln in text.splitlines()]
-        # Try labeled first
-        obj, vars_line, cons_lines = None, None, []
-        mode = None
-        for ln in lines:
-            if not ln:
-                continue
-            lower = ln.lower()
-            if lower.startswith("objetivo:") or lower.startswith("funcion:") or lower.startswith("función:"):
-                obj = ln.split(":", 1)[1].strip()
-                mode = "obj"
-            elif lower.startswith("variables:"):
-                vars_line = ln.split(":", 1)[1].strip()
-                mode = "vars"
-            elif lower.startswith("restricciones:"):
-                mode = "cons"
-            else:
-                if mode == "cons":
-                    cons_lines.append(ln)
-
-        if obj is None or vars_line is None:
-            # Fallback simple format: first non-empty line objective, second variables, rest constraints
-            non_empty = [ln for ln in lines if ln]
-            if len(non_empty) >= 2:
-                obj = obj or non_empty[0]
-                vars_line = vars_line or non_empty[1]
-                cons_lines = non_empty[2:]
-            else:
-                raise ValueError("Formato de archivo .txt no válido. Se esperan al menos 2 líneas: objetivo y variables.")
-
-        return obj, vars_line, "\n".join(cons_lines)
+    warm_start_switch = ft.Switch(label="Reusar soluciones previas", value=True)
+    adjoint_switch = ft.Switch(label="Gradiente por AD inversa", value=False,
+                               tooltip="Calcula el gradiente en modo inverso sobre el árbol de f, sin derivarlo simbólicamente")
 
     def on_file_result(e: ft.FilePickerResultEvent):
         try:
             if not e.files:
                 return
+            from .parsing import ProblemFormatError, load_problems
             path = e.files[0].path
-            with open(path, "r", encoding="utf-8") as f:
-                content = f.read()
-            obj, vars_line, cons_text = parse_txt_problem(content)
-            txt_objective.value = obj
-            txt_vars.value = vars_line
-            txt_constraints.value = cons_text
+            # Solo se lee hasta el segundo problema: los archivos con varios se resuelven con batch.py
+            problems = load_problems(path)
+            try:
+                first = next(problems)
+                more = next(problems, None) is not None
+            finally:
+                problems.close()
+            txt_objective.value = first.objective
+            txt_vars.value = first.variables
+            txt_constraints.value = first.constraints
             txt_objective.update(); txt_vars.update(); txt_constraints.update()
+            if more:
+                txt_results.value = f"ℹ️ El archivo contiene varios problemas; se cargó el primero (línea {first.line}). Usa batch.py para resolverlos todos."
+                txt_results.update()
             if auto_solve_switch.value:
                 on_solve(None)
+        except ProblemFormatError as exc:
+            txt_results.value = f"❌ Error al cargar el archivo, línea {exc.line}: {exc.message}"
+            txt_results.update()
         except Exception:
             txt_results.value = "❌ Error al cargar el archivo: formato no válido. Revisa los ejemplos del README."
             txt_results.update()
@@ -130,17 +148,73 @@ def OptimizerView(page: ft.Page) -> ft.Control:
 
     # Helpers
     def _read_inputs():
+        from .problem import compile_problem
         objective = txt_objective.value.strip()
         variables_text = txt_vars.value.strip()
         constraints_text = txt_constraints.value.strip()
         if not objective or not variables_text:
             raise ValueError("Debes ingresar la función objetivo y las variables.")
-        vars_syms = parse_variables(variables_text)
-        f_expr = parse_objective(objective)
-        return f_expr, vars_syms, constraints_text
+        return compile_problem(objective, variables_text, constraints_text)
+
+    def _gradient_solver():
+        from .optimizers import GradientDescentSolver
+        # Armijo arranca con paso 1.0 y lo reduce; el resto usa el paso base clásico
+        step = cb_step.value or "fixed"
+        alpha = {"armijo": 1.0, "adam": 0.1}.get(step, 0.01)
+        return GradientDescentSolver(alpha=alpha, step=step)
+
+    def _format_path(res: Dict) -> str:
+        # Métodos simbólicos: indica si la respuesta vino de SymPy o del respaldo numérico
+        if res.get("path") == "numeric":
+            return f"Vía: numérica (respaldo: {res.get('fallback_reason', '')})"
+        if res.get("path") == "kkt":
+            return "Vía: Newton numérico sobre el sistema KKT"
+        if res.get("path") == "scipy":
+            return f"Vía: SciPy (respaldo: {res.get('fallback_reason', '')})"
+        return "Vía: simbólica" if res.get("path") == "symbolic" else ""
+
+    def _format_multipliers(res: Dict) -> str:
+        # λ de L = f + Σ λ·c: subir en 1 el lado derecho de una igualdad cambia f óptimo en ≈ -λ
+        eq = (res.get("multipliers") or {}).get("eq")
+        if not eq:
+            return ""
+        return "Multiplicadores (precios sombra): " + ", ".join(f"λ{k + 1}={v:.6g}" for k, v in enumerate(eq))
+
+    STRUCTURE_LABELS = {
+        "lp": "programa lineal (linprog)",
+        "qp": "cuadrático convexo (conjunto activo)",
+        "box": "solo cotas (L-BFGS-B)",
+        "general": "general (SciPy)",
+        "infeasible": "infactible (restricción constante que no se cumple)",
+    }
+
+    def _format_structure(res: Dict) -> str:
+        return f"Estructura: {STRUCTURE_LABELS[res['structure']]}" if res.get("structure") else ""
+
+    def _format_warm(res: Dict) -> str:
+        if not res.get("warm_start"):
+            return ""
+        if "cold_nit" in res:
+            return f"Arranque en caliente: nit={res.get('nit')} (en frío: {res['cold_nit']})"
+        return "Arranque en caliente desde una solución previa"
+
+    def _format_stats(res: Dict) -> str:
+        # Contadores de evaluaciones (solo los métodos numéricos los reportan)
+        keys = [k for k in ("nit", "nfev", "ngev", "nhev", "nkkt") if k in res]
+        return ", ".join(f"{k}={res[k]}" for k in keys)
+
+    PHASE_LABELS = {"diff": "derivadas", "compile": "compilación", "symbolic": "simbólico", "iterate": "iteraciones"}
+
+    def _format_timings(res: Dict) -> str:
+        timings = res.get("timings")
+        if not timings:
+            return ""
+        parts = [f"{label} {timings[k] * 1000:.1f} ms" for k, label in PHASE_LABELS.items() if timings.get(k)]
+        return f"Tiempos: {', '.join(parts)} (total {timings['total'] * 1000:.1f} ms)"
 
     # Validaciones en vivo
     def validate_objective(e=None):
+        from .parsing import parse_objective
         try:
             if txt_objective.value.strip():
                 parse_objective(txt_objective.value)
@@ -150,6 +224,7 @@ def OptimizerView(page: ft.Page) -> ft.Control:
         txt_objective.update()
 
     def validate_vars(e=None):
+        from .parsing import parse_variables
         try:
             if txt_vars.value.strip():
                 parse_variables(txt_vars.value)
@@ -159,19 +234,45 @@ def OptimizerView(page: ft.Page) -> ft.Control:
         txt_vars.update()
 
     def validate_constraints(e=None):
-        try:
-            if txt_constraints.value.strip() and txt_vars.value.strip():
-                # Solo valida si también hay variables
+        import sympy as sp
+        from .parsing import parse_parameter_grid, parse_variables, validate_constraints_text
+        errors = []
+        if txt_constraints.value.strip() and txt_vars.value.strip():
+            try:
                 vars_syms = parse_variables(txt_vars.value)
-                parse_scipy_constraints(vars_syms, txt_constraints.value)
+            except Exception:
+                vars_syms = None  # el error ya se muestra en "Variables"
+            if vars_syms is not None:
+                try:
+                    # Los parámetros del barrido también son símbolos válidos
+                    vars_syms += tuple(sp.Symbol(name) for name in parse_parameter_grid(txt_params.value or "")[0])
+                except ValueError:
+                    pass
+                errors = validate_constraints_text(txt_constraints.value, vars_syms)
+        if errors:
+            number, message = errors[0]
+            more = f" (y {len(errors) - 1} más)" if len(errors) > 1 else ""
+            txt_constraints.error_text = f"Línea {number}: {message}{more}"
+        else:
             txt_constraints.error_text = None
-        except Exception:
-            txt_constraints.error_text = "Restricciones inválidas. Revisa el formato (ver ayuda)."
         txt_constraints.update()
 
-    txt_objective.on_change = validate_objective
-    txt_vars.on_change = lambda e: (validate_vars(), validate_constraints())
-    txt_constraints.on_change = validate_constraints
+    def _debounced(fn, delay: float = 0.3):
+        # Valida cuando se deja de escribir: cada tecla reinicia la espera
+        timer = {"value": None}
+
+        def handler(e=None):
+            if timer["value"] is not None:
+                timer["value"].cancel()
+            timer["value"] = threading.Timer(delay, fn)
+            timer["value"].daemon = True
+            timer["value"].start()
+        return handler
+
+    txt_objective.on_change = _debounced(validate_objective)
+    txt_vars.on_change = _debounced(lambda: (validate_vars(), validate_constraints()))
+    txt_constraints.on_change = _debounced(validate_constraints)
+    txt_params.on_change = _debounced(validate_constraints)
 
     # Diálogo de ayuda
     help_dialog = ft.AlertDialog(
@@ -197,26 +298,105 @@ def OptimizerView(page: ft.Page) -> ft.Control:
         help_dialog.open = True
         page.update()
 
+    # Ejecución en segundo plano: un solo cálculo a la vez, cancelable
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="solver")
+    # "Comparar métodos" reparte los métodos entre procesos, creados en la primera comparación
+    compare_pool = ComparisonPool(timeout=30.0)
+    job = {"future": None, "cancel": threading.Event()}
+
+    def _set_busy(busy: bool):
+        btn_solve.disabled = busy
+        btn_compare.disabled = busy
+        btn_sweep.disabled = busy
+        btn_plot.disabled = busy
+        btn_cancel.visible = busy
+        page.update()
+
+    def _run_in_background(work):
+        if job["future"] is not None and not job["future"].done():
+            return
+        cancel = threading.Event()
+        job["cancel"] = cancel
+        _set_busy(True)
+
+        def runner():
+            try:
+                work(cancel)
+            finally:
+                _set_busy(False)
+
+        job["future"] = executor.submit(runner)
+
+    def _progress_reporter(label: str, cancel: threading.Event, interval: float = 0.15):
+        # Limita las actualizaciones de txt_results a una cada `interval` segundos
+        start = time.monotonic()
+        last = [0.0]
+
+        def report(nit, fval=None, grad_norm=None):
+            if cancel.is_set():
+                from .optimizers import SolveCancelled
+                raise SolveCancelled()
+            now = time.monotonic()
+            if now - last[0] < interval:
+                return
+            last[0] = now
+            lines = [f"⏳ {label}", f"Tiempo: {now - start:.1f} s"]
+            if fval is not None:
+                lines.append(f"Iteración {nit}   f = {fval:.6g}" + (f"   ‖∇f‖ = {grad_norm:.3g}" if grad_norm is not None else ""))
+            else:
+                lines.append("Resolviendo simbólicamente...")
+            txt_results.value = "\n".join(lines)
+            txt_results.update()
+
+        return report
+
+    def on_cancel(e):
+        job["cancel"].set()
+        txt_results.value = "⏹ Cancelando..."
+        txt_results.update()
+
     # Event handlers
     def on_solve(e):
+        _run_in_background(_solve)
+
+    def _solve(cancel: threading.Event):
+        from .optimizers import (SolveCancelled, UnconstrainedSolver, MultiStartGradientDescentSolver, NewtonTrustRegionSolver,
+                                 BFGSSolver, LBFGSSolver, GaussNewtonSolver, LagrangeSolver, ConstrainedSciPySolver, StructuredSolver)
         try:
-            f_expr, vars_syms, constraints_text = _read_inputs()
+            problem = _read_inputs()
             method = cb_method.value
 
-            if "Gradiente" in method:
-                solver = GradientDescentSolver()
-                res = solver.solve(f_expr, vars_syms, constraints_text)
+            if "multi-inicio" in method:
+                solver = MultiStartGradientDescentSolver()
+            elif "Gradiente" in method:
+                solver = _gradient_solver()
+            elif "Gauss-Newton" in method:
+                solver = GaussNewtonSolver()
+            elif "Newton" in method and "Cuasi" not in method:
+                solver = NewtonTrustRegionSolver()
+            elif "L-BFGS" in method:
+                solver = LBFGSSolver()
+            elif "BFGS" in method:
+                solver = BFGSSolver()
             elif "Lagrange" in method:
-                eqs = parse_equalities_text(constraints_text)
-                solver = LagrangeSolver(equalities=eqs)
-                res = solver.solve(f_expr, vars_syms, constraints_text)
-            elif "Sin restricciones" in method and not constraints_text:
+                solver = LagrangeSolver()
+            elif "Sin restricciones" in method and not problem.has_constraints:
                 solver = UnconstrainedSolver()
-                res = solver.solve(f_expr, vars_syms, constraints_text)
+            elif "trust-constr" in method:
+                solver = ConstrainedSciPySolver(method="trust-constr")
+            else:
+                solver = StructuredSolver()
+            solver.progress = _progress_reporter(method, cancel)
+            # Trayectoria de iterados para superponerla en "Graficar"
+            solver.trace_size = 500 if problem.n == 2 else 0
+            solver.derivatives = "adjoint" if adjoint_switch.value else "symbolic"
+            if warm_start_switch.value:
+                from .warmstart import WarmStartStore, solve_with_warm_start
+                if warm_store["value"] is None:
+                    warm_store["value"] = WarmStartStore()
+                res = solve_with_warm_start(solver, problem, warm_store["value"])
             else:
-                cons = parse_scipy_constraints(vars_syms, constraints_text)
-                solver = ConstrainedSciPySolver(scipy_constraints=cons)
-                res = solver.solve(f_expr, vars_syms, constraints_text)
+                res = solver.solve(problem)
 
             if res.get("vars"):
                 out = [f"✔ Método: {method}", ""]
@@ -224,12 +404,32 @@ def OptimizerView(page: ft.Page) -> ft.Control:
                     out.append(f"{k} = {v:.6f}")
                 out.append("")
                 out.append(f"Valor óptimo f = {res['fval']:.6f}")
+                if res.get("message"):
+                    out.append(f"⚠ {res['message']}")
+                for extra in (_format_stats(res), _format_path(res), _format_structure(res), _format_warm(res),
+                              _format_multipliers(res), _format_timings(res)):
+                    if extra:
+                        out.append(extra)
+                if res.get("minima"):
+                    out.append("")
+                    failed = f", {res['n_failed']} fallaron" if res.get("n_failed") else ""
+                    out.append(f"Mínimos locales distintos ({res['n_converged']}/{res['n_starts']} puntos iniciales convergieron{failed}):")
+                    for m in res["minima"][:10]:
+                        var_str = ", ".join(f"{k}={v:.4f}" for k, v in m["vars"].items())
+                        out.append(f"  f={m['fval']:.6f} en {var_str} ({m['count']} inicios)")
                 txt_results.value = "\n".join(out)
-                last_solution["value"] = (f_expr, vars_syms, res)
+                last_solution["value"] = (problem, res)
             else:
                 txt_results.value = "❌ No se encontró solución."
+                if res.get("fallback_reason"):
+                    txt_results.value += f" ({res['fallback_reason']}; el respaldo numérico no convergió)"
+                elif res.get("message"):
+                    txt_results.value += f" ({res['message']})"
                 last_solution["value"] = None
             txt_results.update()
+        except SolveCancelled:
+            txt_results.value = "⏹ Cálculo cancelado."
+            txt_results.update()
         except Exception:
             txt_results.value = "❌ Error al resolver: verifica la función, las variables y las restricciones."
             txt_results.update()
@@ -239,20 +439,30 @@ def OptimizerView(page: ft.Page) -> ft.Control:
             txt_results.value += "\n\n⚠️ Primero resuelve un problema."
             txt_results.update()
             return
-        f_expr, vars_syms, res = last_solution["value"]
-        try:
-            data = plot_function(f_expr, vars_syms, res, show_3d=switch_3d.value)
-            plot_img.src_base64 = data
-            plot_img.visible = True
-            plot_img.update()
-        except Exception:
-            txt_results.value += "\n\n❌ No se pudo graficar. Asegúrate de tener una solución válida y que la función tenga exactamente 2 variables."
-            txt_results.update()
+        problem, res = last_solution["value"]
+        show_3d = switch_3d.value
+
+        def work(cancel: threading.Event):
+            try:
+                from .plotting import plot_progressive
+                # Vista previa de baja resolución y luego la imagen final
+                for data in plot_progressive(problem, res, show_3d=show_3d):
+                    if cancel.is_set():
+                        return
+                    plot_img.src_base64 = data
+                    plot_img.visible = True
+                    plot_img.update()
+            except Exception:
+                txt_results.value += "\n\n❌ No se pudo graficar. Asegúrate de tener una solución válida y que la función tenga exactamente 2 variables."
+                txt_results.update()
+
+        _run_in_background(work)
 
     def on_clear(e):
         txt_objective.value = ""
         txt_vars.value = ""
         txt_constraints.value = ""
+        txt_params.value = ""
         txt_results.value = ""
         plot_img.src_base64 = None
         plot_img.visible = False
@@ -260,41 +470,101 @@ def OptimizerView(page: ft.Page) -> ft.Control:
         txt_results.update()
         plot_img.update()
 
-    def on_compare(e):
+    def on_sweep(e):
+        _run_in_background(_sweep)
+
+    def _sweep_method() -> str:
+        method = cb_method.value or ""
+        if "trust-constr" in method:
+            return "trust-constr"
+        for key, name in (("Newton (", "newton"), ("L-BFGS", "lbfgs"), ("BFGS", "bfgs"), ("Gradiente descendente", "gradient")):
+            if key in method:
+                return name
+        return "scipy"
+
+    def _sweep(cancel: threading.Event):
+        from .optimizers import SolveCancelled
+        from .parsing import parse_parameter_grid
+        from .problem import compile_problem
+        from .sweep import sweep
         try:
-            f_expr, vars_syms, constraints_text = _read_inputs()
-            results = []
-
-            has_constraints = bool(constraints_text.strip())
-            eqs = parse_equalities_text(constraints_text)
-
-            gd = GradientDescentSolver().solve(f_expr, vars_syms, constraints_text)
-            results.append(("Gradiente descendente", gd))
-
-            if not has_constraints:
-                uc = UnconstrainedSolver().solve(f_expr, vars_syms)
-                results.append(("Sin restricciones (minimización directa)", uc))
-
-            if eqs:
-                lg = LagrangeSolver(equalities=eqs).solve(f_expr, vars_syms, constraints_text)
-                results.append(("Método de Lagrange (igualdad)", lg))
-
-            if has_constraints:
-                cons = parse_scipy_constraints(vars_syms, constraints_text)
-                cg = ConstrainedSciPySolver(scipy_constraints=cons).solve(f_expr, vars_syms, constraints_text)
-                results.append(("Con restricciones (general)", cg))
-
-            lines = ["📊 Comparación de métodos", ""]
-            for name, r in results:
+            names, grid = parse_parameter_grid(txt_params.value or "")
+            problem = compile_problem(txt_objective.value.strip(), txt_vars.value.strip(), txt_constraints.value.strip(), ",".join(names))
+            method = _sweep_method()
+            variables = [str(v) for v in problem.vars_syms]
+            header = "  ".join(names + variables + ["f", "nit"])
+            lines = []
+            for k, r in enumerate(sweep(problem, grid, method, cancelled=cancel.is_set), start=1):
+                row = [f"{v:.4g}" for v in r["params"].values()]
                 if r.get("vars"):
-                    lines.append(f"• {name}:")
-                    var_str = ", ".join([f"{k}={v:.4f}" for k, v in r["vars"].items()])
-                    lines.append(f"  {var_str}")
-                    lines.append(f"  f={r['fval']:.6f}")
+                    row += [f"{r['vars'][v]:.6f}" for v in variables] + [f"{r['fval']:.6f}", str(r.get("nit", ""))]
                 else:
-                    lines.append(f"• {name}: sin solución")
+                    row.append("sin solución" if r["status"] == "no_solution" else "error")
+                lines.append("  ".join(row))
+                txt_results.value = "\n".join([f"📈 Barrido ({method}, continuación): {k}/{len(grid)} puntos", "", header] + lines)
+                txt_results.update()
+        except SolveCancelled:
+            txt_results.value += "\n\n⏹ Barrido cancelado."
+            txt_results.update()
+        except Exception:
+            txt_results.value = "❌ Error en el barrido: revisa la función, las variables y los parámetros (ej: p = 0:5:11)."
+            txt_results.update()
+
+    def on_compare(e):
+        _run_in_background(_compare)
+
+    def _render_comparison(solvers, rows: Dict, elapsed: float):
+        lines = ["📊 Comparación de métodos", ""]
+        for name, _ in solvers:
+            if name not in rows:
+                lines.append(f"• {name}: ⏳ en curso ({elapsed:.1f} s)")
                 lines.append("")
-            txt_results.value = "\n".join(lines)
+                continue
+            status, r, seconds = rows[name]
+            if status == "timeout":
+                lines.append(f"• {name}: ⌛ tiempo agotado (> {seconds:.0f} s)")
+            elif status == "error" or not r.get("vars"):
+                lines.append(f"• {name}: sin solución  [{seconds:.3f} s]")
+            else:
+                lines.append(f"• {name}:  [{seconds:.3f} s]")
+                var_str = ", ".join([f"{k}={v:.4f}" for k, v in r["vars"].items()])
+                lines.append(f"  {var_str}")
+                lines.append(f"  f={r['fval']:.6f}")
+                for extra in (_format_stats(r), _format_path(r), _format_structure(r)):
+                    if extra:
+                        lines.append(f"  {extra}")
+            lines.append("")
+        txt_results.value = "\n".join(lines)
+        txt_results.update()
+
+    def _compare(cancel: threading.Event):
+        from .optimizers import (SolveCancelled, UnconstrainedSolver, NewtonTrustRegionSolver, BFGSSolver, LBFGSSolver,
+                                 GaussNewtonSolver, LagrangeSolver, StructuredSolver)
+        try:
+            problem = _read_inputs()
+            solvers = [("Gradiente descendente", _gradient_solver())]
+            if not problem.has_constraints:
+                solvers.append(("Sin restricciones (minimización directa)", UnconstrainedSolver()))
+                solvers.append(("Newton (región de confianza)", NewtonTrustRegionSolver()))
+                solvers.append(("Cuasi-Newton BFGS", BFGSSolver()))
+                solvers.append(("Cuasi-Newton L-BFGS", LBFGSSolver()))
+                if problem.residual_exprs is not None:
+                    solvers.append(("Gauss-Newton (suma de cuadrados)", GaussNewtonSolver()))
+            if problem.equalities:
+                solvers.append(("Método de Lagrange (igualdad)", LagrangeSolver()))
+            if problem.has_constraints:
+                solvers.append(("Con restricciones (general)", StructuredSolver()))
+
+            # Derivadas simbólicas una sola vez aquí; los procesos reciben el problema ya derivado
+            problem.grad, problem.hessian, problem.equalities, problem.structure
+            start = time.monotonic()
+            rows: Dict = {}
+            _render_comparison(solvers, rows, 0.0)
+            for name, status, r, seconds in compare_pool.run(problem, solvers, cancelled=cancel.is_set):
+                rows[name] = (status, r, seconds)
+                _render_comparison(solvers, rows, time.monotonic() - start)
+        except SolveCancelled:
+            txt_results.value = "⏹ Comparación cancelada."
             txt_results.update()
         except Exception:
             txt_results.value = "❌ Error al comparar métodos: revisa los datos de entrada."
@@ -303,8 +573,10 @@ def OptimizerView(page: ft.Page) -> ft.Control:
     btn_solve = ft.FilledButton("Resolver", icon=ft.Icons.PLAY_ARROW, on_click=on_solve)
     btn_plot = ft.OutlinedButton("Graficar", icon=ft.Icons.SHOW_CHART, on_click=on_plot)
     btn_compare = ft.OutlinedButton("Comparar métodos", icon=ft.Icons.TABLE_CHART, on_click=on_compare)
+    btn_sweep = ft.OutlinedButton("Barrido", icon=ft.Icons.STACKED_LINE_CHART, on_click=on_sweep)
+    btn_cancel = ft.OutlinedButton("Cancelar", icon=ft.Icons.STOP, on_click=on_cancel, visible=False)
     btn_clear = ft.TextButton("Limpiar", icon=ft.Icons.CLEAR_ALL, on_click=on_clear)
-    btn_load = ft.FilledTonalButton("Cargar .txt", icon=ft.Icons.UPLOAD_FILE, on_click=lambda e: fp.pick_files(allow_multiple=False, allowed_extensions=["txt"]))
+    btn_load = ft.FilledTonalButton("Cargar .txt", icon=ft.Icons.UPLOAD_FILE, on_click=lambda e: fp.pick_files(allow_multiple=False, allowed_extensions=["txt", "jsonl"]))
 
     inputs_card = ft.Card(
         content=ft.Container(
@@ -318,9 +590,10 @@ def OptimizerView(page: ft.Page) -> ft.Control:
                     txt_objective,
                     txt_vars,
                     txt_constraints,
-                    cb_method,
-                    ft.Row(controls=[switch_3d, auto_solve_switch], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-                    ft.Row(controls=[btn_solve, btn_plot, btn_compare, btn_clear, btn_load], wrap=True, spacing=10),
+                    txt_params,
+                    ft.Row(controls=[cb_method, cb_step]),
+                    ft.Row(controls=[switch_3d, auto_solve_switch, warm_start_switch, adjoint_switch], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                    ft.Row(controls=[btn_solve, btn_cancel, btn_plot, btn_compare, btn_sweep, btn_clear, btn_load], wrap=True, spacing=10),
                 ]
             ),
         )
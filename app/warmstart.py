@@ -0,0 +1,148 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import sympy as sp
+
+from .problem import CompiledProblem
+
+# Every numeric constant is replaced by this placeholder in the signature
+_CONSTANT = sp.Symbol("_c")
+
+Signature = Tuple[Tuple[str, ...], str, Tuple[Tuple[str, str], ...]]
+
+
+def _sum(expr: sp.Expr, numbers: List[float]) -> sp.Expr:
+    # c0 + c1*m1 + c2*m2 + ...: every sum gets an explicit constant term and
+    # every monomial an explicit coefficient, so a 0 or 1 that SymPy drops
+    # (x >= 0, 1*x*y) lands on the same placeholder as any other value
+    const, rest = expr.as_coeff_Add()
+    numbers.append(float(const))
+    terms = []
+    for term in sp.Add.make_args(rest) if rest != 0 else ():
+        coeff, monomial = term.as_coeff_Mul()
+        values = [float(coeff)]
+        skeleton = sp.Mul(_CONSTANT, *[_factor(f, values) for f in sp.Mul.make_args(monomial)], evaluate=False)
+        terms.append((str(skeleton), skeleton, values))
+    # SymPy orders terms partly by their coefficients; the skeletons do not change
+    terms.sort(key=lambda t: t[0])
+    for _, _, values in terms:
+        numbers.extend(values)
+    return sp.Add(_CONSTANT, *[t[1] for t in terms], evaluate=False)
+
+
+def _factor(expr: sp.Expr, numbers: List[float]) -> sp.Expr:
+    if expr.is_Atom:
+        return expr
+    if expr.is_Add:
+        return _sum(expr, numbers)
+    if expr.is_Pow:
+        base, exp = expr.args
+        if exp.is_Number:
+            numbers.append(float(exp))
+            return sp.Pow(_sum(base, numbers), _CONSTANT, evaluate=False)
+        return sp.Pow(_sum(base, numbers), _sum(exp, numbers), evaluate=False)
+    if isinstance(expr, sp.Function):
+        return expr.func(*[_sum(a, numbers) for a in expr.args], evaluate=False)
+    # Sums over indices and other containers: only their literal numbers vary
+    found = [a for a in sp.preorder_traversal(expr) if a.is_Number]
+    numbers.extend(float(a) for a in found)
+    return expr.xreplace({a: _CONSTANT for a in set(found)})
+
+
+def _skeleton(expr: sp.Expr) -> Tuple[str, List[float]]:
+    numbers: List[float] = []
+    skeleton = _sum(sp.sympify(expr), numbers)
+    return str(skeleton), numbers
+
+
+def structural_signature(problem: CompiledProblem) -> Tuple[Signature, np.ndarray]:
+    # (signature, constants): problems that differ only in their numbers share
+    # the signature; the constants tell how far apart two of them are
+    objective, constants = _skeleton(problem.f_expr)
+    constraints = []
+    for ctype, expr in problem.constraint_exprs:
+        skeleton, values = _skeleton(expr)
+        constraints.append((ctype, skeleton))
+        constants += values
+    names = tuple(str(v) for v in problem.vars_syms)
+    return (names, objective, tuple(constraints)), np.array(constants)
+
+
+class WarmStartStore:
+    # LRU map signature -> recent solutions (x, multipliers, constants) plus
+    # the iteration count of the last cold solve per method
+    def __init__(self, max_size: int = 64, per_signature: int = 4):
+        self.max_size = max_size
+        self.per_signature = per_signature
+        self._entries: "OrderedDict[Signature, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def nearest(self, signature: Signature, constants: np.ndarray) -> Optional[Dict]:
+        with self._lock:
+            group = self._entries.get(signature)
+            if group is None or not group["solutions"]:
+                return None
+            self._entries.move_to_end(signature)
+
+            def distance(sol):
+                other = sol["constants"]
+                return float(np.linalg.norm(other - constants)) if other.shape == constants.shape else np.inf
+            return min(group["solutions"], key=distance)
+
+    def cold_nit(self, signature: Signature, method: str) -> Optional[int]:
+        with self._lock:
+            group = self._entries.get(signature)
+            return group["cold_nit"].get(method) if group else None
+
+    def record(self, signature: Signature, constants: np.ndarray, x: np.ndarray, multipliers: Optional[Dict] = None,
+               method: Optional[str] = None, nit: Optional[int] = None) -> None:
+        with self._lock:
+            group = self._entries.pop(signature, None) or {"solutions": [], "cold_nit": {}}
+            group["solutions"] = [sol for sol in group["solutions"] if not np.array_equal(sol["constants"], constants)]
+            group["solutions"].append({"constants": constants, "x": x, "multipliers": multipliers})
+            del group["solutions"][:-self.per_signature]
+            if method is not None and nit is not None:
+                group["cold_nit"][method] = nit
+            self._entries[signature] = group
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def solve_with_warm_start(solver, problem: CompiledProblem, store: WarmStartStore) -> Dict:
+    # Seeds solver.x0 (and solver.multipliers) from the nearest stored solution
+    # of a structurally identical problem; solvers without x0 run unchanged.
+    # The result gets "warm_start" and, when known, "cold_nit" to compare with.
+    signature, constants = structural_signature(problem)
+    method = type(solver).__name__
+    seed = store.nearest(signature, constants) if hasattr(solver, "x0") and solver.x0 is None else None
+    if seed is not None:
+        solver.x0 = seed["x"]
+        if hasattr(solver, "multipliers"):
+            solver.multipliers = seed["multipliers"]
+    try:
+        res = solver.solve(problem)
+    finally:
+        if seed is not None:
+            solver.x0 = None
+            if hasattr(solver, "multipliers"):
+                solver.multipliers = None
+
+    values = [res["vars"].get(str(v)) for v in problem.vars_syms] if res.get("vars") else []
+    if values and None not in values and np.isfinite(values).all():
+        cold_nit = None if seed is not None else res.get("nit")
+        store.record(signature, constants, np.array(values), res.get("multipliers"), method, cold_nit)
+    res["warm_start"] = seed is not None
+    if seed is not None:
+        cold = store.cold_nit(signature, method)
+        if cold is not None:
+            res["cold_nit"] = cold
+    return res
@@ -1,6 +1,7 @@
 import os
+import threading
 import flet as ft
-from app.ui import OptimizerView
+from app.ui import OptimizerView, preload
 
 
 def main(page: ft.Page):
@@ -50,6 +51,8 @@ def main(page: ft.Page):
     )
 
     page.add(OptimizerView(page))
+    # Con la ventana ya visible, importa SymPy/SciPy/matplotlib en segundo plano
+    threading.Thread(target=preload, daemon=True).start()
 
 
 if __name__ == "__main__":
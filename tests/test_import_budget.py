@@ -0,0 +1,5 @@
+from app.benchmark import check_import_budget
+
+
+def test_ui_import_within_budget():
+    assert check_import_budget() == []
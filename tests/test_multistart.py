@@ -0,0 +1,25 @@
+import time
+
+import numpy as np
+
+from app.optimizers import MultiStartGradientDescentSolver
+from app.problem import compile_problem
+
+
+def test_rows_leaving_the_domain_fail_fast():
+    problem = compile_problem("log(x) + (x-2)**2 + y**2", "x,y", "")
+    start = time.perf_counter()
+    with np.errstate(all="ignore"):
+        result = MultiStartGradientDescentSolver(n_starts=200).solve(problem)
+    assert time.perf_counter() - start < 2.0
+    assert result["n_failed"] > 0
+    assert result["n_converged"] + result["n_failed"] <= 200
+    assert np.isfinite(result["fval"])
+    assert abs(result["vars"]["x"] - (1 + np.sqrt(2) / 2)) < 1e-4
+
+
+def test_no_finite_start_returns_no_solution():
+    problem = compile_problem("sqrt(x - 100) + y**2", "x,y", "")
+    with np.errstate(all="ignore"):
+        result = MultiStartGradientDescentSolver().solve(problem)
+    assert result["fval"] is None
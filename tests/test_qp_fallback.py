@@ -0,0 +1,39 @@
+import numpy as np
+import scipy.linalg
+
+from app import optimizers
+from app.optimizers import QuadraticProgramSolver
+from app.problem import compile_problem
+
+
+def test_singular_kkt_fallback_keeps_solver_settings(monkeypatch):
+    lu_factor = scipy.linalg.lu_factor
+
+    def singular(K, **kwargs):
+        lu, piv = lu_factor(K, **kwargs)
+        lu[-1, -1] = 0.0
+        return lu, piv
+
+    seen = {}
+
+    class RecordingSciPySolver(optimizers.ConstrainedSciPySolver):
+        def solve(self, problem):
+            seen.update(derivatives=self.derivatives, trace_size=self.trace_size, callback=self.callback)
+            return super().solve(problem)
+
+    monkeypatch.setattr(scipy.linalg, "lu_factor", singular)
+    monkeypatch.setattr(optimizers, "ConstrainedSciPySolver", RecordingSciPySolver)
+    problem = compile_problem("(x-3)**2 + (y-3)**2", "x,y", "x + y <= 2")
+    calls = []
+    solver = QuadraticProgramSolver()
+    solver.progress = lambda nit, fval, grad_norm: calls.append(nit)
+    solver.callback = lambda nit, x, fval: None
+    solver.trace_size = 50
+    solver.derivatives = "adjoint"
+    result = solver.solve(problem)
+
+    assert result["path"] == "scipy"
+    assert seen == {"derivatives": "adjoint", "trace_size": 50, "callback": solver.callback}
+    assert calls
+    assert len(result["trace"]) > 0
+    assert np.allclose([result["vars"]["x"], result["vars"]["y"]], [1.0, 1.0], atol=1e-5)
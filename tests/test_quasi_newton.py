@@ -0,0 +1,13 @@
+import numpy as np
+import pytest
+
+from app.optimizers import BFGSSolver, LBFGSSolver
+from app.problem import compile_problem
+
+
+@pytest.mark.parametrize("solver_cls", [BFGSSolver, LBFGSSolver])
+def test_standard_rosenbrock_start(solver_cls):
+    problem = compile_problem("100*(y - x**2)**2 + (1 - x)**2", "x,y", "")
+    result = solver_cls(x0=np.array([-1.2, 1.0])).solve(problem)
+    assert result["fval"] < 1e-10
+    assert result["nit"] < 100
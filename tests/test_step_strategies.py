@@ -0,0 +1,25 @@
+import numpy as np
+
+from app.optimizers import BFGSSolver, GradientDescentSolver, LBFGSSolver
+from app.problem import compile_problem
+
+ROSENBROCK = "100*(y - x**2)**2 + (1 - x)**2"
+
+
+def test_barzilai_borwein_converges_on_rosenbrock():
+    problem = compile_problem(ROSENBROCK, "x,y", "")
+    result = GradientDescentSolver(alpha=0.01, step="bb", max_iter=5000).solve(problem)
+    assert result["fval"] < 1e-10
+    assert abs(result["vars"]["x"] - 1.0) < 1e-4
+
+
+def test_failed_line_search_keeps_the_iterate():
+    # At the cusp of sqrt every trial step increases f
+    problem = compile_problem("sqrt(x**2 + y**2)", "x,y", "")
+    for solver in (GradientDescentSolver(alpha=1.0, step="armijo", x0=np.zeros(2)),
+                   BFGSSolver(x0=np.zeros(2)), LBFGSSolver(x0=np.zeros(2))):
+        with np.errstate(all="ignore"):
+            result = solver.solve(problem)
+        assert result["vars"] == {"x": 0.0, "y": 0.0}
+        assert result["fval"] == 0.0
+        assert "message" in result
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from app.optimizers import BFGSSolver
+from app.problem import compile_problem
+from app.warmstart import WarmStartStore, solve_with_warm_start, structural_signature
+
+
+def signature(objective, constraints=""):
+    return structural_signature(compile_problem(objective, "x,y", constraints))
+
+
+@pytest.mark.parametrize("before, after", [
+    (("x*y + (x - 2)**2 + y**2",), ("1.1*x*y + (x - 2)**2 + y**2",)),
+    (("x**2 + y**2", "x >= 0"), ("x**2 + y**2", "x >= 1")),
+    (("(x - 1)**2 + (y - 2)**2",), ("x**2 + y**2",)),
+    (("x*y + 2*x", ), ("3*x*y + x",)),
+])
+def test_editing_a_number_keeps_the_signature(before, after):
+    sig_a, constants_a = signature(*before)
+    sig_b, constants_b = signature(*after)
+    assert sig_a == sig_b
+    assert constants_a.shape == constants_b.shape
+    assert not np.array_equal(constants_a, constants_b)
+
+
+def test_different_structure_changes_the_signature():
+    assert signature("x**2 + y**2")[0] != signature("x**2 + x*y")[0]
+    assert signature("x**2 + y**2", "x >= 0")[0] != signature("x**2 + y**2", "x + y >= 0")[0]
+
+
+def test_unit_coefficient_edit_reuses_the_solution():
+    store = WarmStartStore()
+    solve_with_warm_start(BFGSSolver(), compile_problem("x*y + (x - 2)**2 + (y + 1)**2", "x,y"), store)
+    res = solve_with_warm_start(BFGSSolver(), compile_problem("1.1*x*y + (x - 2)**2 + (y + 1)**2", "x,y"), store)
+    assert res["warm_start"]